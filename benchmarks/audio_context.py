@@ -0,0 +1,73 @@
+"""
+Compares latency and word error rate of transcribing short utterances
+with the full 30-second audio context and with reduced contexts
+rounded to different bucket sizes.
+
+Usage: python -m benchmarks.audio_context --audio one.wav --reference one.txt
+       [--audio two.wav --reference two.txt ...] [--model small.en]
+       [--bucket 0 --bucket 1 ...] (0 means the full context)
+"""
+import argparse
+import time
+
+from live_whisper_gui.settings import settings, user_settings
+from live_whisper_gui.live_whisper.local_backends import (
+    WhisperBackend
+)
+from benchmarks.common import load_audio, prepare_model, word_error_rate
+
+
+BUCKETS_SEC = (0, 0.5, 1, 2, 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--audio", action="append", required=True,
+        help="WAV file with an utterance"
+    )
+    parser.add_argument(
+        "--reference", action="append", required=True,
+        help="Text file with its transcription"
+    )
+    parser.add_argument(
+        "--model",
+        default=settings.DEFAULT_WHISPER_MODEL,
+        help="Name of a model or a path to a local checkpoint"
+    )
+    parser.add_argument("--bucket", action="append", type=float)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if len(args.audio) != len(args.reference):
+        parser.error("Every --audio needs its --reference")
+
+    utterances = []
+    for audio_path, reference_path in zip(args.audio, args.reference):
+        with open(reference_path) as file:
+            utterances.append((load_audio(audio_path), file.read()))
+    backend = WhisperBackend()
+    backend.load(prepare_model(backend, args.model))
+    backend.model_name = args.model
+
+    for bucket in args.bucket or BUCKETS_SEC:
+        user_settings.audio_context_bucket_sec = bucket or None
+        timings, errors = [], []
+        for audio, reference in utterances:
+            backend.transcribe(audio, language="en")
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = backend.transcribe(audio, language="en")
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+            errors.append(word_error_rate(reference, result["text"]))
+        name = f"{bucket:g} s buckets" if bucket else "full context"
+        print(
+            f"{name:<16} latency mean {sum(timings) / len(timings):6.3f} s"
+            f"  max {max(timings):6.3f} s"
+            f"  WER {sum(errors) / len(errors):6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares inference backends on a speech clip: real-time factor
+(processing time divided by the audio duration) and word error rate.
+
+Usage: python -m benchmarks.backends --audio speech.wav --reference speech.txt
+       [--model small.en] [--backend whisper --backend faster-whisper]
+"""
+import argparse
+import time
+
+from live_whisper_gui.settings import settings, inference_backends
+from live_whisper_gui.live_whisper.backends import create_backend
+from benchmarks.common import load_audio, prepare_model, word_error_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--audio", required=True, help="WAV file with speech")
+    parser.add_argument(
+        "--reference", required=True, help="Text file with its transcription"
+    )
+    parser.add_argument(
+        "--model",
+        default=settings.DEFAULT_WHISPER_MODEL,
+        help="Name of a model or a path to a local checkpoint"
+    )
+    parser.add_argument(
+        "--backend", action="append", choices=inference_backends
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio)
+    duration = len(audio) / settings.SAMPLE_RATE
+    with open(args.reference) as file:
+        reference = file.read()
+
+    for name in args.backend or inference_backends:
+        backend = create_backend(name)
+        start = time.perf_counter()
+        backend.load(prepare_model(backend, args.model))
+        load_time = time.perf_counter() - start
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = backend.transcribe(audio, language=None)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{name:<15} load {load_time:6.2f} s  "
+            f"RTF {min(timings) / duration:6.3f}  "
+            f"WER {word_error_rate(reference, result['text']):6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Replays synthetic audio blocks through LiveWhisper._callback and reports
+per-block latency percentiles of the current implementation and of the
+previous one, which concatenated numpy arrays on every block.
+
+Usage: python -m benchmarks.callback_latency [--seconds 120] [--sample-rate N]
+"""
+import argparse
+import time
+from io import BytesIO
+
+import numpy as np
+from scipy.io.wavfile import write
+
+from live_whisper_gui.settings import settings, user_settings
+from live_whisper_gui.live_whisper.main import LiveWhisper
+
+
+class SilentThread:
+    def sendMessage(self, *args, **kwargs):
+        pass
+
+
+class LegacyCallback:
+    """
+    The callback as it was before the preallocated AudioBuffer.
+    """
+    vocal_range_hz = 50, 5000
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.max_buffer_length = int(
+            sample_rate * settings.MAX_TRANSCRIBE_BUFFER_SEC
+        )
+        self.padding = 0
+        self.buffer = np.zeros((0, 1))
+        self.prev_block = self.buffer.copy()
+
+    def __call__(self, indata, frames, time, status):
+        if not indata.any():
+            return
+        if len(self.buffer) > self.max_buffer_length:
+            return self._save_audio()
+        freq = (
+            np.argmax(np.abs(np.fft.rfft(indata[:, 0])))
+            * self.sample_rate / frames
+        )
+        if (
+            indata.max() > user_settings.input_device_sensitivity
+            and (
+                self.vocal_range_hz[0] <= freq <= self.vocal_range_hz[1]
+            )
+        ):
+            if self.padding < 1:
+                self.buffer = self.prev_block.copy()
+            self.buffer = np.concatenate((self.buffer, indata))
+            self.padding = settings.SILENT_BLOCKS_TO_SAVE
+        else:
+            self.padding -= 1
+            if self.padding > 1:
+                self.buffer = np.concatenate((self.buffer, indata))
+            elif self.buffer.shape[0] > self.sample_rate:
+                self._save_audio()
+            else:
+                self.prev_block = indata.copy()
+
+    def _save_audio(self):
+        write(BytesIO(), self.sample_rate, self.buffer)
+        self.buffer = np.zeros((0, 1))
+
+
+def synthetic_blocks(seconds: float, block_size: int, sample_rate: int):
+    """
+    Generates blocks alternating between a voice-like tone and a quiet noise.
+    Utterances vary from short phrases to a monologue longer than
+    the maximum buffer length.
+    """
+    rng = np.random.default_rng(0)
+    utterances = (1.5, 3.0, 12.0)
+    blocks = []
+    total = int(seconds * sample_rate / block_size)
+    t = np.arange(block_size) / sample_rate
+    while len(blocks) < total:
+        for utterance in utterances:
+            for i in range(int(utterance * sample_rate / block_size)):
+                tone = 0.2 * np.sin(2 * np.pi * 220 * (t + i * t[-1]))
+                blocks.append(tone.astype(np.float32)[:, None])
+            for _ in range(int(0.6 * sample_rate / block_size)):
+                noise = rng.normal(0, 0.0001, block_size)
+                blocks.append(noise.astype(np.float32)[:, None])
+    return blocks[:total]
+
+
+def measure(callback, blocks) -> np.ndarray:
+    latencies = np.empty(len(blocks))
+    for i, block in enumerate(blocks):
+        start = time.perf_counter_ns()
+        callback(block, len(block), None, None)
+        latencies[i] = time.perf_counter_ns() - start
+    return latencies / 1000
+
+
+def report(name: str, latencies: np.ndarray):
+    p50, p90, p99 = np.percentile(latencies, (50, 90, 99))
+    print(
+        f"{name:<8} p50 {p50:8.1f} us  p90 {p90:8.1f} us  "
+        f"p99 {p99:8.1f} us  max {latencies.max():8.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument(
+        "--sample-rate", type=int, default=settings.SAMPLE_RATE
+    )
+    args = parser.parse_args()
+
+    LiveWhisper.sample_rate = args.sample_rate
+    LiveWhisper.reset()
+    LiveWhisper._qt_thread = SilentThread()
+    blocks = synthetic_blocks(
+        args.seconds, LiveWhisper.block_size, args.sample_rate
+    )
+    print(f"{len(blocks)} blocks of {LiveWhisper.block_size} samples")
+    report("before", measure(LegacyCallback(args.sample_rate), blocks))
+    report("after", measure(LiveWhisper._callback, blocks))
+
+
+if __name__ == "__main__":
+    main()
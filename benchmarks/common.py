@@ -0,0 +1,70 @@
+"""
+Helpers shared by benchmarks.
+"""
+import os
+import re
+import sys
+
+import numpy as np
+from scipy.io.wavfile import read
+
+from live_whisper_gui.settings import settings
+from live_whisper_gui.live_whisper.resampling import resample
+
+
+class ConsoleThread:
+    """
+    Stands in for the GUI threads and prints their messages to stderr.
+    """
+    def sendMessage(self, message: str, *args, **kwargs):
+        if args and args[0] != args[-1]:
+            done = args[0] * 100 // max(args[-1], 1)
+            print(f"\r{message} {done}%", end="", file=sys.stderr)
+        else:
+            print(f"\r{message}", file=sys.stderr)
+
+    def sendStats(self, stats: dict):
+        pass
+
+
+def prepare_model(backend, model: str) -> str:
+    """
+    Downloads a model by its name, unless a path to a local file is given.
+    Returns a value to pass to backend.load().
+    """
+    if os.path.isfile(model):
+        return model
+    return backend.download(ConsoleThread(), model)
+
+
+def load_audio(path: str) -> np.ndarray:
+    """
+    Loads a WAV file as mono float32 audio with Whisper's sample rate.
+    """
+    rate, audio = read(path)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if np.issubdtype(audio.dtype, np.integer):
+        audio = audio / np.iinfo(audio.dtype).max
+    return resample(audio.astype(np.float32), rate, settings.SAMPLE_RATE)
+
+
+def normalize(text: str) -> list[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Returns the word error rate of a hypothesis against a reference text.
+    """
+    reference, hypothesis = normalize(reference), normalize(hypothesis)
+    distances = list(range(len(hypothesis) + 1))
+    for i, reference_word in enumerate(reference, start=1):
+        previous, distances[0] = distances[0], i
+        for j, hypothesis_word in enumerate(hypothesis, start=1):
+            previous, distances[j] = distances[j], min(
+                distances[j] + 1,
+                distances[j - 1] + 1,
+                previous + (reference_word != hypothesis_word),
+            )
+    return distances[-1] / max(len(reference), 1)
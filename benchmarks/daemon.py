@@ -0,0 +1,152 @@
+"""
+Measures how long it takes to get a working model with and without
+the model daemon: loading it in process, attaching to a daemon which
+is started on first use, and attaching to an already running one.
+Clients attach from a new interpreter, like the GUI does, so their
+times include imports; they fail if the client imports torch.
+Checks that the daemon exits after the idle timeout.
+
+Usage: python -m benchmarks.daemon [--model small.en] [--audio speech.wav]
+       [--idle-timeout 3]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from live_whisper_gui.settings import settings
+from live_whisper_gui.live_whisper.backends import create_local_backend
+from live_whisper_gui.live_whisper.remote import RemoteBackend
+from benchmarks.common import ConsoleThread, load_audio, prepare_model
+
+
+ATTACH_SCRIPT = """
+import json
+import sys
+import time
+from pathlib import Path
+start = time.perf_counter()
+
+from live_whisper_gui.settings import settings
+from live_whisper_gui.live_whisper.remote import RemoteBackend
+
+
+class QuietThread:
+    def sendMessage(self, *args):
+        pass
+
+
+settings.MODEL_DAEMON_SOCKET = Path(sys.argv[1])
+settings.MODEL_DAEMON_IDLE_TIMEOUT_SEC = float(sys.argv[3])
+imported = time.perf_counter()
+backend = RemoteBackend("whisper")
+backend.load(backend.download(QuietThread(), sys.argv[2]))
+print(json.dumps({
+    "import": imported - start,
+    "attach": time.perf_counter() - imported,
+    "heavy_modules": [
+        name for name in ("torch", "whisper", "scipy") if name in sys.modules
+    ],
+}))
+"""
+
+
+def attach(socket_path: Path, model: str, idle_timeout: float) -> dict:
+    """
+    Attaches to the daemon from a new interpreter. Returns seconds spent
+    on imports and on attaching, the total time including the start
+    of the interpreter and heavy modules the client has imported.
+    """
+    start = time.perf_counter()
+    output = subprocess.run(
+        [
+            sys.executable, "-c", ATTACH_SCRIPT,
+            str(socket_path), model, str(idle_timeout)
+        ],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return {
+        **json.loads(output.splitlines()[-1]),
+        "total": time.perf_counter() - start,
+    }
+
+
+def print_attach(name: str, timings: dict):
+    print(
+        f"{name:<19} {timings['total']:7.3f} s"
+        f"  (imports {timings['import']:.3f} s,"
+        f" attach {timings['attach']:.3f} s)"
+    )
+    if timings["heavy_modules"]:
+        print(
+            f"client imported {', '.join(timings['heavy_modules'])}",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--model",
+        default=settings.DEFAULT_WHISPER_MODEL,
+        help="Name of a model or a path to a local checkpoint"
+    )
+    parser.add_argument("--audio", help="WAV file to transcribe")
+    parser.add_argument("--idle-timeout", type=float, default=3)
+    args = parser.parse_args()
+
+    if args.audio:
+        audio = load_audio(args.audio)
+    else:
+        audio = np.zeros(3 * settings.SAMPLE_RATE, dtype=np.float32)
+
+    start = time.perf_counter()
+    local = create_local_backend("whisper")
+    local.load(prepare_model(local, args.model))
+    print(f"in process load     {time.perf_counter() - start:7.3f} s")
+
+    with tempfile.TemporaryDirectory() as socket_dir:
+        settings.MODEL_DAEMON_SOCKET = Path(socket_dir, "daemon.sock")
+        settings.MODEL_DAEMON_IDLE_TIMEOUT_SEC = args.idle_timeout
+
+        print_attach(
+            "daemon, first start",
+            attach(settings.MODEL_DAEMON_SOCKET, args.model, args.idle_timeout)
+        )
+        backend = RemoteBackend("whisper")
+        backend.load(backend.download(ConsoleThread(), args.model))
+        for name, transcriber in (("in process", local), ("daemon", backend)):
+            start = time.perf_counter()
+            text = transcriber.transcribe(audio, language="en")["text"]
+            print(
+                f"{name + ' transcribe':<19} "
+                f"{time.perf_counter() - start:7.3f} s  {text[:40]!r}"
+            )
+        backend.close()
+
+        print_attach(
+            "daemon, attach",
+            attach(settings.MODEL_DAEMON_SOCKET, args.model, args.idle_timeout)
+        )
+
+        start = time.perf_counter()
+        while settings.MODEL_DAEMON_SOCKET.exists():
+            if time.perf_counter() - start > args.idle_timeout + 10:
+                print("daemon has not exited after the idle timeout")
+                break
+            time.sleep(0.1)
+        else:
+            print(
+                f"daemon exited       "
+                f"{time.perf_counter() - start:7.3f} s after the last client"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Measures time saved by cutting decoding loops ("you you you ...")
+on a set of fixtures: synthetic sounds models often hallucinate on
+(silence, noise, hum, tones and clicks) and optional WAV files.
+Every fixture is transcribed with and without cutting loops;
+time saved is averaged over fixtures where a loop was cut.
+
+Usage: python -m benchmarks.decoding_loops [--audio noise.wav ...]
+       [--model small.en] [--profile balanced] [--no-synthetic]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from live_whisper_gui.settings import (
+    decoding_profiles,
+    settings,
+    user_settings
+)
+from live_whisper_gui.live_whisper.local_backends import (
+    WhisperBackend
+)
+from benchmarks.common import load_audio, prepare_model
+
+
+DURATION_SEC = 5
+
+
+def synthetic_fixtures() -> dict[str, np.ndarray]:
+    """
+    Returns sounds without speech, which make models hallucinate.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(DURATION_SEC * settings.SAMPLE_RATE) / settings.SAMPLE_RATE
+    clicks = np.zeros_like(t)
+    clicks[::settings.SAMPLE_RATE // 4] = 0.5
+    fixtures = {
+        "silence": np.zeros_like(t),
+        "noise": rng.normal(scale=0.01, size=len(t)),
+        "hum": 0.05 * np.sin(2 * np.pi * 50 * t),
+        "tones": sum(
+            0.03 * np.sin(2 * np.pi * frequency * t)
+            for frequency in (262, 330, 392)
+        ),
+        "clicks": clicks,
+    }
+    return {
+        name: audio.astype(np.float32) for name, audio in fixtures.items()
+    }
+
+
+def measure(
+        backend: WhisperBackend,
+        audio: np.ndarray,
+        cut_loops: bool,
+        repeat: int
+) -> tuple[float, dict]:
+    """
+    Returns the best transcription time and the result.
+    """
+    user_settings.loop_cutting_enabled = cut_loops
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = backend.transcribe(audio, language="en")
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--audio", action="append", default=[],
+        help="WAV file to add to the fixtures"
+    )
+    parser.add_argument(
+        "--model",
+        default=settings.DEFAULT_WHISPER_MODEL,
+        help="Name of a model or a path to a local checkpoint"
+    )
+    parser.add_argument(
+        "--profile", choices=decoding_profiles, default="balanced"
+    )
+    parser.add_argument("--no-synthetic", action="store_true")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    fixtures = {} if args.no_synthetic else synthetic_fixtures()
+    for path in args.audio:
+        fixtures[os.path.basename(path)] = load_audio(path)
+    if not fixtures:
+        parser.error("No fixtures to transcribe")
+    backend = WhisperBackend()
+    backend.load(prepare_model(backend, args.model))
+    backend.model_name = args.model
+    user_settings.decoding_profile = args.profile
+    # Fixtures have no speech, so they mustn't be skipped undecoded.
+    user_settings.no_speech_gate_threshold = None
+
+    loops, saved = 0, 0.
+    for name, audio in fixtures.items():
+        full_time, full_result = measure(backend, audio, False, args.repeat)
+        cut_time, cut_result = measure(backend, audio, True, args.repeat)
+        if cut_result.get("looped"):
+            loops += 1
+            saved += full_time - cut_time
+        print(
+            f"{name:<16} full {full_time:6.3f} s"
+            f" ({full_result['retries']} retries)"
+            f"  cut {cut_time:6.3f} s ({cut_result['retries']} retries)"
+            f"  {'loop cut' if cut_result.get('looped') else 'no loop'}"
+        )
+    print(f"Loops cut: {loops} of {len(fixtures)} fixtures")
+    if loops:
+        print(f"Time saved per loop: {saved / loops:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Downloads a fake model from a local HTTP server, which drops connections
+at random points, and checks the downloaded file: sequentially,
+with parallel ranges, after an interrupted run and from a server
+without range support.
+
+Usage: python -m benchmarks.download [--size-mb 64] [--rate-mb 32]
+       [--drop-probability 0.3]
+"""
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from live_whisper_gui.live_whisper.downloading import download
+
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    """
+    Serves the same bytes at any path. Every response is dropped
+    at a random point with the server's drop probability.
+    """
+    def do_HEAD(self):
+        self._send_headers(200, len(self.server.data))
+
+    def do_GET(self):
+        data = self.server.data
+        start, end = 0, len(data)
+        requested_range = self.headers.get("Range")
+        if requested_range and self.server.accepts_ranges:
+            first, _, last = requested_range.split("=")[1].partition("-")
+            start, end = int(first), int(last) + 1 if last else len(data)
+            self._send_headers(206, end - start)
+        else:
+            self._send_headers(200, end - start)
+        if random.random() < self.server.drop_probability:
+            end = random.randint(start, end)
+            self.close_connection = True
+        chunk_size = 64 * 1024
+        for position in range(start, end, chunk_size):
+            self.wfile.write(data[position:min(position + chunk_size, end)])
+            time.sleep(chunk_size / self.server.rate)
+
+    def _send_headers(self, code: int, length: int):
+        self.send_response(code)
+        self.send_header("Content-Length", str(length))
+        if self.server.accepts_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(
+        data: bytes,
+        rate: float,
+        drop_probability: float,
+        accepts_ranges: bool = True
+) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeModelHandler)
+    server.daemon_threads = True
+    server.data = data
+    server.rate = rate
+    server.drop_probability = drop_probability
+    server.accepts_ranges = accepts_ranges
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument(
+        "--rate-mb", type=float, default=32,
+        help="Speed of one connection in MB/s"
+    )
+    parser.add_argument("--drop-probability", type=float, default=0.3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    data = random.randbytes(args.size_mb * 1024 * 1024)
+    sha256 = hashlib.sha256(data).hexdigest()
+    rate = args.rate_mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        target = os.path.join(work_dir, "fake.pt")
+
+        def run(name: str, server: ThreadingHTTPServer, **kwargs):
+            url = f"http://127.0.0.1:{server.server_port}/{sha256}/fake.pt"
+            start = time.perf_counter()
+            downloaded = download(url, target, sha256, **kwargs)
+            elapsed = time.perf_counter() - start
+            with open(target, "rb") as file:
+                correct = downloaded and file.read() == data
+            print(
+                f"{name:<28} {elapsed:6.2f} s  "
+                f"{args.size_mb / elapsed:7.1f} MB/s  "
+                f"{'ok' if correct else 'CORRUPTED'}"
+            )
+            os.unlink(target)
+
+        server = start_server(data, rate, args.drop_probability)
+        run("sequential", server, retries=20)
+        run("4 parallel ranges", server, connections=4, retries=20)
+
+        server.drop_probability = 1
+        try:
+            download(
+                f"http://127.0.0.1:{server.server_port}/fake.pt",
+                target, sha256, retries=0
+            )
+        except ConnectionError:
+            pass
+        part_size = os.path.getsize(f"{target}.part")
+        server.drop_probability = args.drop_probability
+        run(
+            f"resumed from {part_size / 2 ** 20:.0f} MB",
+            server, retries=20
+        )
+        server.shutdown()
+
+        server = start_server(
+            data, rate, drop_probability=0, accepts_ranges=False
+        )
+        run("without range support", server, connections=4)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measures CPU time the transcription worker spends while no segments
+are coming, and checks it stops quickly once the listening is stopped.
+
+Usage: python -m benchmarks.idle_cpu [--seconds 3] [--max-cpu-percent 5]
+"""
+import argparse
+import sys
+import threading
+import time
+
+from live_whisper_gui.live_whisper.main import LiveWhisper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--max-cpu-percent", type=float, default=5)
+    args = parser.parse_args()
+
+    LiveWhisper.reset()
+    LiveWhisper.running = True
+    cpu_time = {}
+
+    def worker():
+        start = time.thread_time()
+        while LiveWhisper.running:
+            LiveWhisper._process()
+        cpu_time["worker"] = time.thread_time() - start
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(args.seconds)
+    stop_started = time.perf_counter()
+    LiveWhisper.stop()
+    thread.join()
+    stop_time = time.perf_counter() - stop_started
+
+    cpu_percent = cpu_time["worker"] / args.seconds * 100
+    print(
+        f"worker CPU time {cpu_time['worker'] * 1000:.1f} ms "
+        f"over {args.seconds} s idle ({cpu_percent:.2f}%), "
+        f"stopped in {stop_time * 1000:.1f} ms"
+    )
+    if cpu_percent > args.max_cpu_percent:
+        sys.exit(
+            f"Idle worker uses more than {args.max_cpu_percent}% of a core"
+        )
+
+
+if __name__ == "__main__":
+    main()
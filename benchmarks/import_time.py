@@ -0,0 +1,115 @@
+"""
+Measures how long importing the GUI takes and how soon InitializeWindow
+is painted, and fails if heavy modules are imported before the first
+window is shown or the import takes longer than the budget.
+
+Usage: python -m benchmarks.import_time [--budget-ms 500] [--no-paint]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+GUI_MODULE = "live_whisper_gui.gui.windows.main"
+HEAVY_MODULES = (
+    "torch",
+    "whisper",
+    "scipy",
+    "ffmpeg",
+    "faster_whisper",
+    "ctranslate2",
+)
+PAINT_SCRIPT = """
+import os
+import time
+start = time.perf_counter()
+
+from PyQt5 import QtCore, QtWidgets
+from live_whisper_gui.gui.windows.main import InitializeWindow
+
+
+class PaintFilter(QtCore.QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint:
+            print(time.perf_counter() - start, flush=True)
+            os._exit(0)
+        return False
+
+
+app = QtWidgets.QApplication([])
+window = InitializeWindow(whisper_model="tiny.en")
+paintFilter = PaintFilter()
+window.installEventFilter(paintFilter)
+window.show()
+app.exec_()
+"""
+
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    """
+    Imports a module in a new interpreter with "-X importtime".
+    Returns names of all imported modules with their own
+    and cumulative import times in microseconds.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    ).stderr
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(self_time), int(cumulative)))
+    return times
+
+
+def paint_time() -> float:
+    """
+    Returns seconds from the start of a new interpreter
+    to the first paint of InitializeWindow.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", PAINT_SCRIPT],
+        capture_output=True, text=True, timeout=60,
+        env={"QT_QPA_PLATFORM": "offscreen", **os.environ}
+    ).stdout
+    return float(output.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=500)
+    parser.add_argument("--no-paint", action="store_true")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    times = import_times(GUI_MODULE)
+    total = next(
+        cumulative for name, _, cumulative in times if name == GUI_MODULE
+    ) / 1000
+    print(f"import {GUI_MODULE}: {total:.0f} ms")
+    print("slowest modules (own time):")
+    for name, self_time, _ in sorted(times, key=lambda x: -x[1])[:args.top]:
+        print(f"  {self_time / 1000:7.1f} ms  {name}")
+    if not args.no_paint:
+        print(f"InitializeWindow painted after {paint_time() * 1000:.0f} ms")
+
+    heavy = sorted({
+        name for name, _, _ in times
+        if name.split(".")[0] in HEAVY_MODULES
+    })
+    failed = False
+    if heavy:
+        roots = sorted({name.split(".")[0] for name in heavy})
+        print(f"FAIL: heavy modules are imported: {', '.join(roots)}")
+        failed = True
+    if total > args.budget_ms:
+        print(f"FAIL: import takes more than {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Measures startup time and memory of the whisper backend with different
+loading options. Every measurement runs in a fresh process, so peak RSS
+and caches are not shared between them.
+
+"whisper.load_model" is the reference loader, which reads the whole
+checkpoint to RAM, and "float32" is the memory-mapped one.
+
+Usage: python -m benchmarks.model_load [--model small.en] [--all-sizes]
+       [--audio speech.wav]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from live_whisper_gui.settings import settings, user_settings
+
+
+MODEL_SIZES = ("tiny", "base", "small", "medium", "large-v3")
+CONFIGS = {
+    "whisper.load_model": {"quantize_model": False, "reference": True},
+    "float32": {"quantize_model": False},
+    "int8 first start": {"quantize_model": True},
+    "int8 cached": {"quantize_model": True},
+}
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/status") as file:
+        for line in file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def child(model: str, options: dict, audio_path: str | None):
+    import whisper
+    from live_whisper_gui.live_whisper.local_backends import (
+        WhisperBackend
+    )
+    from benchmarks.common import load_audio, prepare_model
+
+    reference = options.pop("reference", False)
+    for key, value in options.items():
+        setattr(user_settings, key, value)
+    backend = WhisperBackend()
+    model_path = prepare_model(backend, model)
+    start = time.perf_counter()
+    if reference:
+        backend.model = whisper.load_model(model_path, device="cpu")
+    else:
+        backend.load(model_path)
+    result = {
+        "load_time": time.perf_counter() - start,
+        "rss": current_rss_mb(),
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    if audio_path:
+        audio = load_audio(audio_path)
+        start = time.perf_counter()
+        backend.transcribe(audio, language="en")
+        result["rtf"] = (
+            (time.perf_counter() - start)
+            / (len(audio) / settings.SAMPLE_RATE)
+        )
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--model",
+        action="append",
+        help="Name of a model or a path to a local checkpoint"
+    )
+    parser.add_argument(
+        "--all-sizes",
+        action="store_true",
+        help=f"Measure models of all sizes: {', '.join(MODEL_SIZES)}"
+    )
+    parser.add_argument("--audio", help="WAV file to measure RTF on")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        options = json.loads(args.child)
+        return child(options.pop("model"), options, args.audio)
+
+    from live_whisper_gui.live_whisper.quantization import (
+        quantized_cache_path
+    )
+
+    models = args.model or (settings.DEFAULT_WHISPER_MODEL,)
+    if args.all_sizes:
+        models = MODEL_SIZES
+    for model in models:
+        for name, options in CONFIGS.items():
+            if name == "int8 first start":
+                quantized_cache_path(
+                    model if os.path.isfile(model) else f"{model}.pt"
+                ).unlink(missing_ok=True)
+            command = [
+                sys.executable, "-m", "benchmarks.model_load",
+                "--child", json.dumps({"model": model, **options}),
+            ]
+            if args.audio:
+                command += ["--audio", args.audio]
+            output = subprocess.run(
+                command, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            line = (
+                f"{model:<10} {name:<18} load {result['load_time']:6.2f} s  "
+                f"RSS {result['rss']:7.0f} MB  "
+                f"peak {result['peak_rss']:7.0f} MB"
+            )
+            if "rtf" in result:
+                line += f"  RTF {result['rtf']:.3f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
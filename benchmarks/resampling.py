@@ -0,0 +1,96 @@
+"""
+Compares the in-process scipy resampler with the ffmpeg round-trip:
+time per segment and how close their outputs (and transcriptions) are.
+
+Usage: python -m benchmarks.resampling [--audio speech.wav] [--model tiny.en]
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.io.wavfile import read
+
+from live_whisper_gui.settings import settings
+from live_whisper_gui.live_whisper.resampling import resample
+
+
+WHISPER_SAMPLE_RATE = settings.SAMPLE_RATE
+CAPTURE_SAMPLE_RATE = 44100
+RESAMPLERS = ("ffmpeg", "scipy")
+
+
+def load_segments(path: str | None) -> tuple[int, list[np.ndarray]]:
+    """
+    Loads an audio file and splits it into 5 second segments.
+    Without a file, synthetic segments of 1 to 9 seconds are generated
+    with a sample rate devices fall back to when they can't record
+    at Whisper's one.
+    """
+    if path is None:
+        rng = np.random.default_rng(0)
+        rate = CAPTURE_SAMPLE_RATE
+        return rate, [
+            rng.normal(0, 0.1, int(seconds * rate)).astype(np.float32)
+            for seconds in (1, 2, 3, 5, 9)
+        ]
+    rate, audio = read(path)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if np.issubdtype(audio.dtype, np.integer):
+        audio = audio / np.iinfo(audio.dtype).max
+    audio = audio.astype(np.float32)
+    step = 5 * rate
+    return rate, [
+        audio[start:start + step] for start in range(0, len(audio), step)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--audio", help="WAV file to use as input")
+    parser.add_argument("--model", help="Whisper model to compare texts with")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rate, segments = load_segments(args.audio)
+    outputs = {}
+    for resampler in RESAMPLERS:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outputs[resampler] = [
+                resample(segment, rate, WHISPER_SAMPLE_RATE, resampler)
+                for segment in segments
+            ]
+            timings.append(time.perf_counter() - start)
+        per_segment = min(timings) / len(segments) * 1000
+        print(f"{resampler:<7} {per_segment:8.2f} ms per segment")
+
+    for reference, candidate in zip(*outputs.values()):
+        length = min(len(reference), len(candidate))
+        noise = reference[:length] - candidate[:length]
+        snr = 10 * np.log10(
+            np.sum(reference[:length] ** 2) / max(np.sum(noise ** 2), 1e-12)
+        )
+        print(
+            f"segment of {length / WHISPER_SAMPLE_RATE:5.2f} s: "
+            f"{len(reference) - len(candidate):+d} samples, SNR {snr:5.1f} dB"
+        )
+
+    if args.model:
+        import whisper
+
+        model = whisper.load_model(args.model)
+        for i, pair in enumerate(zip(*outputs.values())):
+            texts = [
+                model.transcribe(audio, fp16=False)["text"].strip()
+                for audio in pair
+            ]
+            status = "same" if texts[0] == texts[1] else "DIFFERENT"
+            print(f"segment {i}: {status}")
+            for resampler, text in zip(RESAMPLERS, texts):
+                print(f"    {resampler:<7} {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Sweeps PyTorch intra-op thread counts on a fixed clip with the whisper
+backend and recommends the fastest count for this host.
+
+Usage: python -m benchmarks.threads [--audio speech.wav] [--model small.en]
+       [--threads 1,2,4,8]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import torch
+
+from live_whisper_gui.settings import settings, user_settings
+from live_whisper_gui.live_whisper.local_backends import (
+    WhisperBackend
+)
+from benchmarks.common import load_audio, prepare_model
+
+
+def default_thread_counts() -> list[int]:
+    cpus = os.cpu_count() or 1
+    counts = {1, cpus}
+    count = 2
+    while count < cpus:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--audio", help="WAV file to transcribe")
+    parser.add_argument(
+        "--model",
+        default=settings.DEFAULT_WHISPER_MODEL,
+        help="Name of a model or a path to a local checkpoint"
+    )
+    parser.add_argument("--threads", help="Comma-separated thread counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.audio:
+        audio = load_audio(args.audio)
+    else:
+        rng = np.random.default_rng(0)
+        audio = rng.normal(0, 0.05, 5 * settings.SAMPLE_RATE)
+        audio = audio.astype(np.float32)
+    counts = (
+        [int(count) for count in args.threads.split(",")]
+        if args.threads else
+        default_thread_counts()
+    )
+
+    backend = WhisperBackend()
+    backend.load(prepare_model(backend, args.model))
+    # The default clip is noise, so it mustn't be skipped undecoded.
+    user_settings.no_speech_gate_threshold = None
+    backend.transcribe(audio, language="en")
+
+    timings = {}
+    for count in counts:
+        torch.set_num_threads(count)
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            backend.transcribe(audio, language="en")
+            runs.append(time.perf_counter() - start)
+        timings[count] = np.median(runs)
+        print(
+            f"{count:>3} threads  median {timings[count]:6.2f} s  "
+            f"min {min(runs):6.2f} s  max {max(runs):6.2f} s"
+        )
+
+    fastest = min(timings.values())
+    recommended = min(
+        count for count, timing in timings.items()
+        if timing <= fastest * 1.05
+    )
+    print(
+        f"Recommended: {recommended} threads "
+        f"(--threads {recommended} or LIVE_WHISPER_NUM_THREADS={recommended})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compares voice activity detectors with the previous check
+(peak level plus the loudest FFT bin within 50-5000 Hz) on synthetic
+sounds: share of blocks detected as speech and time per block.
+
+Usage: python -m benchmarks.vad [--sample-rate N] [--backend energy]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from live_whisper_gui.settings import settings, user_settings
+from live_whisper_gui.live_whisper.vad import VAD_BACKENDS
+
+
+SECONDS = 3
+
+
+def legacy_is_speech(sample_rate: int):
+    def is_speech(block: np.ndarray) -> bool:
+        freq = (
+            np.argmax(np.abs(np.fft.rfft(block[:, 0])))
+            * sample_rate / len(block)
+        )
+        return (
+            block.max() > user_settings.input_device_sensitivity
+            and 50 <= freq <= 5000
+        )
+    return is_speech
+
+
+def synthetic_sounds(sample_rate: int) -> dict[str, np.ndarray]:
+    """
+    Generates a few seconds of sounds which should and should not
+    be detected as speech.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(SECONDS * sample_rate) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(
+        np.sin(k * phase) / k * (1 + np.cos(2 * np.pi * k * 140 / 1000))
+        for k in range(1, 25)
+        if k * 170 < sample_rate / 2
+    )
+    hiss = rng.normal(0, 1, len(t))
+    fricative = np.diff(np.diff(hiss, prepend=0), prepend=0)
+    hum = sum(np.sin(2 * np.pi * 60 * k * t) / k ** 2 for k in range(1, 4))
+    clicks = np.zeros(len(t))
+    clicks[::sample_rate // 7] = 1
+    clicks = np.convolve(clicks, rng.normal(0, 1, 200), mode="same")
+    sounds = {
+        "voiced speech": voiced,
+        "quiet fricative": fricative,
+        "60 Hz hum": hum,
+        "keyboard clicks": clicks,
+        "room noise": hiss,
+    }
+    levels = {
+        "voiced speech": 0.2,
+        "quiet fricative": 0.03,
+        "60 Hz hum": 0.2,
+        "keyboard clicks": 0.3,
+        "room noise": 0.003,
+    }
+    return {
+        name: (sound / np.abs(sound).max() * levels[name]).astype(np.float32)
+        for name, sound in sounds.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sample-rate", type=int, default=settings.SAMPLE_RATE
+    )
+    parser.add_argument(
+        "--backend", action="append", choices=tuple(VAD_BACKENDS)
+    )
+    args = parser.parse_args()
+
+    block_size = int(args.sample_rate * settings.BLOCK_SIZE_MSEC / 1000)
+    detectors = {"legacy": legacy_is_speech(args.sample_rate)}
+    for backend in args.backend or ("energy",):
+        detector = VAD_BACKENDS[backend](args.sample_rate, block_size)
+        detectors[backend] = detector.is_speech
+
+    print(f"{'':<16}" + "".join(f"{name:>18}" for name in detectors))
+    for sound_name, sound in synthetic_sounds(args.sample_rate).items():
+        blocks = [
+            sound[start:start + block_size, None]
+            for start in range(0, len(sound) - block_size + 1, block_size)
+        ]
+        row = f"{sound_name:<16}"
+        for is_speech in detectors.values():
+            start = time.perf_counter()
+            detected = sum(bool(is_speech(block)) for block in blocks)
+            per_block = (time.perf_counter() - start) / len(blocks) * 1e6
+            row += f"{detected / len(blocks):>8.0%} {per_block:>6.1f} us"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
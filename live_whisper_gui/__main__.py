@@ -1,4 +1,5 @@
 import sys
+import argparse
 
 from PyQt5 import QtWidgets
 
@@ -6,15 +7,59 @@ from live_whisper_gui.settings import settings, user_settings
 from live_whisper_gui.gui.windows.main import MainWindow, SettingsWindow
 
 
+def parse_arguments() -> list[str]:
+    """
+    Applies command line options to settings of this run.
+    Returns arguments left for Qt.
+    """
+    parser = argparse.ArgumentParser(prog="python -m live_whisper_gui")
+    parser.add_argument(
+        "--threads",
+        type=int,
+        help="number of threads used inside one inference operation"
+    )
+    parser.add_argument(
+        "--interop-threads",
+        type=int,
+        help="number of threads running independent inference operations"
+    )
+    parser.add_argument(
+        "--cpu-affinity",
+        help='CPUs to run the transcription on, like "0-3,8"'
+    )
+    parser.add_argument(
+        "--verify-model",
+        action="store_true",
+        help="recompute checksum of the downloaded model"
+    )
+    parser.add_argument(
+        "--model-daemon",
+        action="store_true",
+        help="keep the model loaded in a background process between runs"
+    )
+    args, qt_args = parser.parse_known_args()
+    if args.threads:
+        settings.TORCH_NUM_THREADS = args.threads
+    if args.interop_threads:
+        settings.TORCH_INTEROP_THREADS = args.interop_threads
+    if args.cpu_affinity:
+        settings.WORKER_CPU_AFFINITY = args.cpu_affinity
+    if args.verify_model:
+        settings.VERIFY_MODEL = True
+    if args.model_daemon:
+        settings.MODEL_DAEMON = True
+    return sys.argv[:1] + qt_args
+
+
 if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
+    app = QtWidgets.QApplication(parse_arguments())
     while True:
         ui = MainWindow()
         ui.show()
         return_code = app.exec_()
         user_settings.window_size = (ui.size().width(), ui.size().height())
         user_settings.save()
+        ui.close()
         if return_code == settings.RESTART_ERROR_CODE:
-            ui.close()
             continue
         sys.exit(return_code)
@@ -0,0 +1,100 @@
+from PyQt5 import QtCore
+
+from live_whisper_gui.gui.threads import DeviceEnumerationThread
+from live_whisper_gui.live_whisper.devices import device_enumerator
+from live_whisper_gui.settings import settings
+
+
+class InputDeviceList(QtCore.QObject):
+    """
+    Cached names of available input devices, shared by all windows.
+    Devices are enumerated in the background. While any window showing
+    them is open, the list is refreshed periodically, so connected
+    and disconnected devices appear without a restart. Refreshes reuse
+    one worker process, which is stopped when no window is watching.
+
+    Attributes
+    ----------
+    devicesChangedSignal: QtCore.pyqtSignal
+        Object to send an event with new names of input devices.
+    errorHappenedSignal: QtCore.pyqtSignal
+        Object to send an error event, when devices can't be enumerated.
+    devices: list[str]
+        Names of input devices. None until the first enumeration finishes.
+    """
+    devicesChangedSignal = QtCore.pyqtSignal(list)
+    errorHappenedSignal = QtCore.pyqtSignal(object)
+    devices: list[str] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._thread = None
+        self._refreshPending = False
+        self._watchers = 0
+        self._timer = None
+
+    def load(self):
+        """
+        Starts the first enumeration, if it hasn't been started yet.
+        """
+        if self.devices is None and self._thread is None:
+            self._startThread(fresh=False)
+
+    def refresh(self):
+        """
+        Enumerates devices again, including ones connected after the start.
+        """
+        if self._thread is not None:
+            self._refreshPending = True
+            return
+        self._startThread(fresh=True)
+
+    def startWatching(self):
+        """
+        Starts periodic refreshing. Every call must be paired
+        with stopWatching().
+        """
+        self._watchers += 1
+        if self._timer is None:
+            self._timer = QtCore.QTimer(self)
+            self._timer.setInterval(
+                int(settings.DEVICE_POLL_INTERVAL_SEC * 1000)
+            )
+            self._timer.timeout.connect(self.refresh)
+        if not self._timer.isActive():
+            self.load()
+            self._timer.start()
+
+    def stopWatching(self):
+        self._watchers = max(self._watchers - 1, 0)
+        if self._watchers:
+            return
+        if self._timer is not None:
+            self._timer.stop()
+        if self._thread is None:
+            device_enumerator.close()
+
+    def _startThread(self, fresh: bool):
+        self._thread = DeviceEnumerationThread(self, fresh=fresh)
+        self._thread.devicesFoundSignal.connect(self._devicesFound)
+        self._thread.errorHappenedSignal.connect(self.errorHappenedSignal)
+        self._thread.finished.connect(self._threadFinished)
+        self._thread.start()
+
+    def _devicesFound(self, devices: list):
+        if devices == self.devices:
+            return
+        self.devices = devices
+        self.devicesChangedSignal.emit(devices)
+
+    def _threadFinished(self):
+        self._thread.deleteLater()
+        self._thread = None
+        if self._refreshPending:
+            self._refreshPending = False
+            self.refresh()
+        elif not self._watchers:
+            device_enumerator.close()
+
+
+input_device_list = InputDeviceList()
@@ -1,7 +1,17 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
 from PyQt5 import QtCore, QtGui, QtWidgets
 
-from live_whisper_gui.live_whisper.main import LiveWhisper
-from live_whisper_gui.live_whisper.model_download import model_download
+from live_whisper_gui.settings import user_settings
+from live_whisper_gui.live_whisper.progress import ProgressReporter
+
+
+# LiveWhisper imports sounddevice, which initializes PortAudio, and local
+# inference backends import torch and whisper, which takes seconds,
+# so they are imported by the threads when they are needed.
+if TYPE_CHECKING:
+    from live_whisper_gui.live_whisper.backends import InferenceBackend
 
 
 class InitializationThread(QtCore.QThread):
@@ -31,14 +41,36 @@ class InitializationThread(QtCore.QThread):
         self._modelName = modelName
 
     def run(self):
+        from live_whisper_gui.live_whisper.backends import create_backend
+
         try:
-            model_path = model_download(qt_thread=self, name=self._modelName)
-            self.sendMessage('Loading the model...', 15, 100)
-            LiveWhisper.init(model_path=model_path)
-            self.sendMessage('Loading the model...', 90, 100)
+            backend = create_backend(user_settings.inference_backend)
+            model_path = backend.download(qt_thread=self, name=self._modelName)
+            self.loadModel(
+                backend=backend,
+                model_path=model_path,
+                progress=ProgressReporter(self.sendMessage)
+            )
         except Exception as error:
             self.errorHappenedSignal.emit(error)
 
+    def loadModel(
+            self,
+            backend: InferenceBackend,
+            model_path: str,
+            progress: ProgressReporter
+    ):
+        """
+        Loads a downloaded model and makes LiveWhisper use it.
+        """
+        from live_whisper_gui.live_whisper.main import LiveWhisper
+
+        LiveWhisper.init(
+            backend=backend,
+            model_path=model_path,
+            progress=progress
+        )
+
     def sendMessage(self, stage: str, progress: int, total: int):
         """
         Used to send a message to the GUI (InitializeWindow).
@@ -55,6 +87,75 @@ class InitializationThread(QtCore.QThread):
         self.messageReceivedSignal.emit(stage, progress, total)
 
 
+class ModelSwapThread(InitializationThread):
+    """
+    Thread used by GUI (MainWindow) to download and load another model
+    in the background, while the current one keeps transcribing.
+    """
+    def loadModel(
+            self,
+            backend: InferenceBackend,
+            model_path: str,
+            progress: ProgressReporter
+    ):
+        from live_whisper_gui.live_whisper.main import LiveWhisper
+
+        LiveWhisper.swap_backend(
+            backend=backend,
+            model_path=model_path,
+            progress=progress
+        )
+
+    @staticmethod
+    def loadedModelName() -> str:
+        """
+        Returns name of the model LiveWhisper transcribes with.
+        """
+        from live_whisper_gui.live_whisper.main import LiveWhisper
+
+        return LiveWhisper.backend.model_name
+
+
+class DeviceEnumerationThread(QtCore.QThread):
+    """
+    Thread used by GUI (InputDeviceList) to enumerate input devices
+    without blocking the GUI.
+
+    Attributes
+    ----------
+    devicesFoundSignal: QtCore.pyqtSignal
+        Object to send an event with names of found input devices.
+    errorHappenedSignal: QtCore.pyqtSignal
+        Object to send an error event,
+        when devices can't be enumerated.
+    """
+    devicesFoundSignal = QtCore.pyqtSignal(list)
+    errorHappenedSignal = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent=None, fresh: bool = False):
+        """
+        Parameters
+        ----------
+        fresh: bool
+            Enumerate devices in a worker process, so ones connected
+            after the start are found too.
+        """
+        super().__init__(parent=parent)
+        self._fresh = fresh
+
+    def run(self):
+        from live_whisper_gui.live_whisper import devices
+
+        try:
+            self.devicesFoundSignal.emit(
+                devices.device_enumerator.input_devices()
+                if self._fresh else
+                devices.input_devices()
+            )
+        except Exception as error:
+            self.errorHappenedSignal.emit(error)
+
+
 class LiveWhisperThread(QtCore.QThread):
     """
     Thread used by GUI (MainWindow) and
@@ -64,11 +165,14 @@ class LiveWhisperThread(QtCore.QThread):
     ----------
     messageReceivedSignal: QtCore.pyqtSignal
         Object to send an event with new message from the function to the GUI.
+    statsReceivedSignal: QtCore.pyqtSignal
+        Object to send an event with updated statistics to the GUI.
     errorHappenedSignal: QtCore.pyqtSignal
         Object to senf an error event,
         when something goes wrong in the function.
     """
-    messageReceivedSignal = QtCore.pyqtSignal(str)
+    messageReceivedSignal = QtCore.pyqtSignal(str, bool)
+    statsReceivedSignal = QtCore.pyqtSignal(dict)
     errorHappenedSignal = QtCore.pyqtSignal(object)
 
     def __init__(self, parent, inputDevice: str = None):
@@ -82,6 +186,8 @@ class LiveWhisperThread(QtCore.QThread):
         self._inputDevice = inputDevice
 
     def run(self):
+        from live_whisper_gui.live_whisper.main import LiveWhisper
+
         try:
             LiveWhisper.listen(
                 qt_thread=self,
@@ -90,7 +196,38 @@ class LiveWhisperThread(QtCore.QThread):
         except Exception as error:
             self.errorHappenedSignal.emit(error)
 
-    def sendMessage(self, message: str):
+    def stop(self):
+        """
+        Stops listening and waits until the thread finishes.
+        """
+        from live_whisper_gui.live_whisper.main import LiveWhisper
+
+        LiveWhisper.stop()
+        self.wait()
+
+    def switchInputDevice(self, inputDevice: str):
+        """
+        Continues listening with another input device.
+
+        Parameters
+        ----------
+        inputDevice: str
+            Name of an input device to listen to.
+        """
+        from live_whisper_gui.live_whisper.main import LiveWhisper
+
+        self._inputDevice = inputDevice
+        LiveWhisper.switch_input_device(inputDevice)
+
+    def redetectLanguage(self):
+        """
+        Makes the language of the speech be detected again.
+        """
+        from live_whisper_gui.live_whisper.main import LiveWhisper
+
+        LiveWhisper.redetect_language()
+
+    def sendMessage(self, message: str, partial: bool = False):
         """
         Used to send a message to the GUI (MainWindow).
 
@@ -98,5 +235,19 @@ class LiveWhisperThread(QtCore.QThread):
         ----------
         message: str
             Message to send to the GUI.
+        partial: bool
+            True if the message is a transcription of an unfinished
+            utterance, which will be replaced by the next message.
+        """
+        self.messageReceivedSignal.emit(message, partial)
+
+    def sendStats(self, stats: dict):
+        """
+        Used to send statistics of the transcription to the GUI (MainWindow).
+
+        Parameters
+        ----------
+        stats: dict
+            Names of counters mapped to their values.
         """
-        self.messageReceivedSignal.emit(message)
+        self.statsReceivedSignal.emit(stats)
@@ -1,4 +1,3 @@
-import sounddevice
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 from live_whisper_gui.gui.mixins import (
@@ -6,6 +5,7 @@ from live_whisper_gui.gui.mixins import (
     BlackDesignedWindow
 )
 from live_whisper_gui.gui.threads import InitializationThread
+from live_whisper_gui.gui.devices import input_device_list
 from live_whisper_gui.settings import settings, whisper_models, user_settings
 
 
@@ -153,12 +153,10 @@ class WhisperModelSelectorWindow(SettingsWindow):
 class InputDeviceSelector(SettingsWindow):
     """
     Settings window with available input devices to listen to.
+    Devices are enumerated in the background and the list is updated
+    when they are connected or disconnected.
     """
     chosenDevice: str = None
-    availableDevices = [
-        device['name'] for device in sounddevice.query_devices()
-        if device['max_input_channels'] > 0
-    ]
 
     def initGUI(self):
         super().initGUI()
@@ -166,21 +164,15 @@ class InputDeviceSelector(SettingsWindow):
         self.label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
 
         self.listWidget = QtWidgets.QListWidget()
-        self.listWidget.addItems(self.availableDevices)
         self.listWidget.itemClicked.connect(
             lambda: self.chooseButton.setEnabled(True)
         )
         self.chooseButton.setDisabled(True)
-        if user_settings.default_input_device:
-            try:
-                row_index = self.availableDevices.index(
-                    user_settings.default_input_device
-                )
-            except ValueError:
-                pass
-            else:
-                self.listWidget.setCurrentRow(row_index)
-                self.chooseButton.setDisabled(False)
+        self.searchLabel = QtWidgets.QLabel("Searching for input devices...")
+        self.searchLabel.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.searchLabel.setStyleSheet("font-size: 9pt;")
+        self.refreshButton = QtWidgets.QPushButton("Refresh")
+        self.refreshButton.clicked.connect(input_device_list.refresh)
 
         self.checkbox = QtWidgets.QCheckBox("Show this window on every start")
         self.checkbox.setChecked(True)
@@ -189,16 +181,54 @@ class InputDeviceSelector(SettingsWindow):
         layout = self.layout()
         layout.addWidget(self.label)
         layout.addWidget(self.listWidget)
+        layout.addWidget(self.searchLabel)
         layout.addWidget(
             self.checkbox,
             alignment=QtCore.Qt.AlignmentFlag.AlignCenter
         )
+        layout.addWidget(self.refreshButton)
         layout.addWidget(self.chooseButton)
 
+        input_device_list.devicesChangedSignal.connect(self.updateDevices)
+        input_device_list.errorHappenedSignal.connect(self.errorHappened)
+        if input_device_list.devices is not None:
+            self.updateDevices(input_device_list.devices)
+        else:
+            input_device_list.load()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        input_device_list.startWatching()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        input_device_list.stopWatching()
+
+    def updateDevices(self, devices: list):
+        """
+        Shows new names of input devices, keeping the selected one.
+        """
+        selectedItems = self.listWidget.selectedItems()
+        selectedDevice = (
+            selectedItems[0].text() if selectedItems
+            else user_settings.default_input_device
+        )
+        self.listWidget.clear()
+        self.listWidget.addItems(devices)
+        self.searchLabel.setVisible(not devices)
+        self.searchLabel.setText("No input devices found")
+        if selectedDevice in devices:
+            self.listWidget.setCurrentRow(devices.index(selectedDevice))
+        self.chooseButton.setEnabled(bool(self.listWidget.selectedItems()))
+
+    def errorHappened(self, error: Exception):
+        self.searchLabel.setText(f"Can't find input devices: {error}")
+        self.searchLabel.show()
+
     def okButtonPressed(self):
-        selectedItem = self.listWidget.selectedItems().pop()
-        if not selectedItem:
+        if not self.listWidget.selectedItems():
             return
+        selectedItem = self.listWidget.selectedItems().pop()
         self.chosenDevice = selectedItem.text()
         show_input_selector_on_startup = self.checkbox.checkState() == 2
         if (
@@ -7,14 +7,20 @@ from live_whisper_gui.gui.windows.init import (
     WhisperModelSelectorWindow,
     InputDeviceSelector
 )
+from live_whisper_gui.gui.devices import input_device_list
 from live_whisper_gui.gui.mixins import (
     FramelessWindow,
     MovableFramelessWindow,
     BlackDesignedWindow
 )
 from live_whisper_gui.gui.widgets import AdvancedTextEdit
-from live_whisper_gui.gui.threads import LiveWhisperThread
-from live_whisper_gui.settings import settings, whisper_models, user_settings
+from live_whisper_gui.gui.threads import LiveWhisperThread, ModelSwapThread
+from live_whisper_gui.settings import (
+    settings,
+    whisper_models,
+    decoding_profiles,
+    user_settings
+)
 
 
 class MainWindow(
@@ -24,7 +30,20 @@ class MainWindow(
 ):
     """
     The main window class, containing all the main functionality.
+
+    Attributes
+    ----------
+    partialMessagePosition: int
+        Position in the text where a partial message
+        (transcription of an unfinished utterance) starts.
+        None if there is no partial message on the screen.
+    pendingWhisperModel: str
+        Model chosen while another one was being loaded.
+        It's loaded after that one.
     """
+    partialMessagePosition: int = None
+    pendingWhisperModel: str = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.initUI()
@@ -38,13 +57,20 @@ class MainWindow(
 
         self.textEdit = AdvancedTextEdit(self)
         self.textEdit.setPlaceholderText("Listening...")
+        self.statusLabel = QtWidgets.QLabel()
+        self.statusLabel.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.statusLabel.setWordWrap(True)
+        self.statusLabel.setStyleSheet("font-size: 9pt;")
+        self.statusLabel.hide()
         widget = FramelessWindow()
-        layout = QtWidgets.QHBoxLayout(widget)
+        layout = QtWidgets.QVBoxLayout(widget)
         layout.addWidget(self.textEdit)
+        layout.addWidget(self.statusLabel)
         self.setCentralWidget(widget)
         self.toolBarWindow = ToolbarWindow()
 
     def beforeStartup(self):
+        input_device_list.load()
         self.chooseWhisperModelWindow = WhisperModelSelectorWindow(self)
         if not user_settings.whisper_model:
             self.chooseWhisperModelWindow.exec()
@@ -72,8 +98,21 @@ class MainWindow(
         self.whisperThread.messageReceivedSignal.connect(
             self.whisperMessageReceived
         )
+        self.whisperThread.statsReceivedSignal.connect(
+            self.toolBarWindow.settingsWindow.updateStats
+        )
         self.whisperThread.finished.connect(self.whisperThreadFinished)
         self.whisperThread.start()
+        settingsWindow = self.toolBarWindow.settingsWindow
+        settingsWindow.whisperModelChangedSignal.connect(
+            self.changeWhisperModel
+        )
+        settingsWindow.inputDeviceChangedSignal.connect(
+            self.whisperThread.switchInputDevice
+        )
+        settingsWindow.languageRedetectionRequestedSignal.connect(
+            self.whisperThread.redetectLanguage
+        )
 
     def eventFilter(self, obj, event):
         if obj == self and event.type() == QtCore.QEvent.Move:
@@ -102,18 +141,28 @@ class MainWindow(
         self.toolBarWindow.stopClosing = False
         QtCore.QTimer.singleShot(400, self.toolBarWindow.hideIfNotHovered)
 
-    def whisperMessageReceived(self, message: str):
+    def whisperMessageReceived(self, message: str, partial: bool = False):
         if self.textEdit.isEnabled():
             return
         self.textEdit.moveCursor(QtGui.QTextCursor.MoveOperation.End)
         message = message.strip()
-        if len(message) == 1:
+        if len(message) == 1 and not partial:
             if user_settings.print_dots_while_listening:
                 self.textEdit.insertPlainText('.')
-        else:
-            if not user_settings.print_dots_while_listening:
-                return self.textEdit.append(message)
-            cursor = self.textEdit.textCursor()
+            return
+        if (
+            self.partialMessagePosition is None
+            and not partial
+            and not user_settings.print_dots_while_listening
+        ):
+            return self.textEdit.append(message)
+        cursor = self.textEdit.textCursor()
+        if self.partialMessagePosition is not None:
+            cursor.setPosition(
+                min(self.partialMessagePosition, cursor.position()),
+                QtGui.QTextCursor.MoveMode.KeepAnchor
+            )
+        elif user_settings.print_dots_while_listening:
             while True:
                 cursor.movePosition(
                     QtGui.QTextCursor.MoveOperation.PreviousCharacter,
@@ -130,14 +179,78 @@ class MainWindow(
                         1
                     )
                     break
-            if message:
-                cursor.insertText(f"{message}\n")
-            else:
-                cursor.removeSelectedText()
+        if not user_settings.print_dots_while_listening:
+            # Like append() does, every message starts on a new line.
+            text = f"\n{message}" if cursor.selectionStart() else message
+        elif partial:
+            text = message
+        else:
+            text = f"{message}\n"
+        if partial:
+            self.partialMessagePosition = cursor.selectionStart()
+            cursor.insertText(text)
+            return
+        self.partialMessagePosition = None
+        if message:
+            cursor.insertText(text)
+        else:
+            cursor.removeSelectedText()
 
     def whisperThreadFinished(self):
         del self.whisperThread
 
+    def changeWhisperModel(self, modelName: str):
+        """
+        Loads another model in the background. The current model keeps
+        transcribing until the new one is ready.
+        """
+        if hasattr(self, 'modelSwapThread'):
+            self.pendingWhisperModel = modelName
+            return
+        self._modelSwapFailed = False
+        self.modelSwapThread = ModelSwapThread(self, modelName)
+        self.modelSwapThread.messageReceivedSignal.connect(
+            self.modelSwapMessageReceived
+        )
+        self.modelSwapThread.errorHappenedSignal.connect(
+            self.modelSwapFailed
+        )
+        self.modelSwapThread.finished.connect(self.modelSwapFinished)
+        self.modelSwapThread.start()
+
+    def modelSwapMessageReceived(self, stage: str, progress: int, total: int):
+        self.statusLabel.setText(f"{stage} {progress*100//total}%")
+        self.statusLabel.show()
+
+    def modelSwapFailed(self, error: Exception):
+        self._modelSwapFailed = True
+        user_settings.whisper_model = ModelSwapThread.loadedModelName()
+        user_settings.save()
+        self.toolBarWindow.settingsWindow.whisperModelList.setCurrentText(
+            user_settings.whisper_model
+        )
+        self.statusLabel.setText(f"Can't load the model: {error}")
+        self.statusLabel.show()
+
+    def modelSwapFinished(self):
+        del self.modelSwapThread
+        if self._modelSwapFailed:
+            QtCore.QTimer.singleShot(5000, self.statusLabel.hide)
+        else:
+            self.statusLabel.hide()
+        if self.pendingWhisperModel:
+            modelName = self.pendingWhisperModel
+            self.pendingWhisperModel = None
+            if modelName != ModelSwapThread.loadedModelName():
+                self.changeWhisperModel(modelName)
+
+    def closeEvent(self, event):
+        if hasattr(self, 'whisperThread'):
+            self.whisperThread.stop()
+        if hasattr(self, 'modelSwapThread'):
+            self.modelSwapThread.wait()
+        super().closeEvent(event)
+
 
 class ToolbarWindow(BlackDesignedWindow):
     """
@@ -191,7 +304,21 @@ class ToolbarWindow(BlackDesignedWindow):
 class SettingsWindow(BlackDesignedWindow, MovableFramelessWindow):
     """
     Window opened by the "settings" button of the ToolbarWindow.
+
+    Attributes
+    ----------
+    whisperModelChangedSignal: QtCore.pyqtSignal
+        Object to send an event with a newly chosen Whisper model.
+    inputDeviceChangedSignal: QtCore.pyqtSignal
+        Object to send an event with a newly chosen input device.
+    languageRedetectionRequestedSignal: QtCore.pyqtSignal
+        Object to send an event when the language of the speech
+        must be detected again.
     """
+    whisperModelChangedSignal = QtCore.pyqtSignal(str)
+    inputDeviceChangedSignal = QtCore.pyqtSignal(str)
+    languageRedetectionRequestedSignal = QtCore.pyqtSignal()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.initGUI()
@@ -211,14 +338,31 @@ class SettingsWindow(BlackDesignedWindow, MovableFramelessWindow):
         self.whisperModelList.addItems(whisper_models)
         self.whisperModelList.setCurrentText(user_settings.whisper_model)
 
+        self.decodingProfileListLabel = QtWidgets.QLabel("Decoding")
+        self.decodingProfileListLabel.setFont(self.inputLabelFont)
+        self.decodingProfileListLabel.setContentsMargins(0, 4, 0, 1)
+        self.decodingProfileList = QtWidgets.QComboBox()
+        for profile in decoding_profiles:
+            self.decodingProfileList.addItem(
+                profile.replace('_', ' ').capitalize(), profile
+            )
+        self.decodingProfileList.setCurrentIndex(
+            decoding_profiles.index(user_settings.decoding_profile)
+        )
+
         self.defaultInputDeviceLabel = QtWidgets.QLabel("Default input device")
         self.defaultInputDeviceLabel.setFont(self.inputLabelFont)
         self.defaultInputDeviceLabel.setContentsMargins(0, 4, 0, 1)
         self.defaultInputDevice = QtWidgets.QComboBox()
-        self.defaultInputDevice.addItems(InputDeviceSelector.availableDevices)
-        self.defaultInputDevice.setCurrentText(
-            user_settings.default_input_device
-        )
+        self.refreshDevicesButton = QtWidgets.QPushButton("⟳")
+        self.refreshDevicesButton.setFixedWidth(24)
+        self.refreshDevicesButton.setToolTip("Refresh input devices")
+        self.refreshDevicesButton.clicked.connect(input_device_list.refresh)
+        inputDeviceLayout = QtWidgets.QHBoxLayout()
+        inputDeviceLayout.addWidget(self.defaultInputDevice)
+        inputDeviceLayout.addWidget(self.refreshDevicesButton)
+        input_device_list.devicesChangedSignal.connect(self.updateDevices)
+        self.updateDevices(input_device_list.devices or [])
 
         self.inputDeviceSensitivitySliderLabel = QtWidgets.QLabel(
             "Input device sensitivity"
@@ -236,6 +380,12 @@ class SettingsWindow(BlackDesignedWindow, MovableFramelessWindow):
             // settings.MAX_INPUT_DEVICE_SENSITIVITY
         ))
 
+        self.statsLabel = QtWidgets.QLabel()
+        self.statsLabel.setFont(self.inputLabelFont)
+        self.statsLabel.setStyleSheet("font-weight: normal;")
+        self.statsLabel.setContentsMargins(0, 4, 0, 1)
+        self.statsLabel.hide()
+
         self.printDotsWhileListeningCheckbox = QtWidgets.QCheckBox(
             "Print dots while listening"
         )
@@ -262,6 +412,13 @@ class SettingsWindow(BlackDesignedWindow, MovableFramelessWindow):
             QtCore.Qt.Unchecked
         )
 
+        self.redetectLanguageButton = QtWidgets.QPushButton(
+            "Detect language again"
+        )
+        self.redetectLanguageButton.clicked.connect(
+            self.languageRedetectionRequestedSignal
+        )
+
         self.okButton = QtWidgets.QPushButton("OK")
         self.okButton.clicked.connect(self.okButtonPressed)
 
@@ -270,15 +427,58 @@ class SettingsWindow(BlackDesignedWindow, MovableFramelessWindow):
         layout.addWidget(self.settingsLabel)
         layout.addWidget(self.whisperModelListLabel)
         layout.addWidget(self.whisperModelList)
+        layout.addWidget(self.decodingProfileListLabel)
+        layout.addWidget(self.decodingProfileList)
         layout.addWidget(self.defaultInputDeviceLabel)
-        layout.addWidget(self.defaultInputDevice)
+        layout.addLayout(inputDeviceLayout)
         layout.addWidget(self.inputDeviceSensitivitySliderLabel)
         layout.addWidget(self.inputDeviceSensitivitySlider)
         layout.addWidget(self.printDotsWhileListeningCheckbox)
         layout.addWidget(self.showInputSelectorCheckbox)
+        layout.addWidget(self.statsLabel)
+        layout.addWidget(self.redetectLanguageButton)
         layout.addWidget(self.okButton)
         self.setLayout(layout)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        input_device_list.startWatching()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        input_device_list.stopWatching()
+
+    def updateDevices(self, devices: list):
+        """
+        Shows new names of input devices, keeping the chosen one.
+        If it's disconnected, it stays chosen as a disabled item,
+        so it isn't replaced by another device on saving.
+        """
+        chosenDevice = (
+            self.defaultInputDevice.currentData()
+            or user_settings.default_input_device
+        )
+        self.defaultInputDevice.clear()
+        for device in devices:
+            self.defaultInputDevice.addItem(device, device)
+        if chosenDevice and chosenDevice not in devices:
+            self.defaultInputDevice.addItem(
+                f"{chosenDevice} (disconnected)", chosenDevice
+            )
+            self.defaultInputDevice.model().item(
+                self.defaultInputDevice.count() - 1
+            ).setEnabled(False)
+        index = self.defaultInputDevice.findData(chosenDevice)
+        if index >= 0:
+            self.defaultInputDevice.setCurrentIndex(index)
+
+    def updateStats(self, stats: dict):
+        self.statsLabel.setText("\n".join(
+            f"{name.replace('_', ' ').capitalize()}: {value}"
+            for name, value in stats.items()
+        ))
+        self.statsLabel.show()
+
     def inputDeviceSenditivityChanged(self):
         user_settings.input_device_sensitivity = (
             self.inputDeviceSensitivitySlider.value()
@@ -288,7 +488,11 @@ class SettingsWindow(BlackDesignedWindow, MovableFramelessWindow):
     def okButtonPressed(self):
         new_user_settings = {
             "whisper_model": self.whisperModelList.currentText(),
-            "default_input_device": self.defaultInputDevice.currentText(),
+            "decoding_profile": self.decodingProfileList.currentData(),
+            "default_input_device": (
+                self.defaultInputDevice.currentData()
+                or user_settings.default_input_device
+            ),
             "input_device_sensitivity": (
                 self.inputDeviceSensitivitySlider.value()
                 * settings.INPUT_DEVICE_SENSITIVITY_STEP
@@ -305,22 +509,10 @@ class SettingsWindow(BlackDesignedWindow, MovableFramelessWindow):
         for key, value in new_user_settings.items():
             setattr(user_settings, key, value)
         user_settings.save()
-        if (
-            old_whisper_model != user_settings.whisper_model
-            or old_default_input_device != user_settings.default_input_device
-        ):
-            self.askAboutRestart()
+        if old_whisper_model != user_settings.whisper_model:
+            self.whisperModelChangedSignal.emit(user_settings.whisper_model)
+        if old_default_input_device != user_settings.default_input_device:
+            self.inputDeviceChangedSignal.emit(
+                user_settings.default_input_device
+            )
         self.close()
-
-    def askAboutRestart(self):
-        dlg = QtWidgets.QMessageBox(self)
-        dlg.setWindowTitle("Restart is required")
-        dlg.setText(
-            "Restart is required in order to apply new changes. Restart now?"
-        )
-        dlg.setStandardButtons(
-            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
-        )
-        button = dlg.exec()
-        if button == QtWidgets.QMessageBox.StandardButton.Yes:
-            QtCore.QCoreApplication.exit(999)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from live_whisper_gui.settings import (
+    settings,
+    user_settings,
+    inference_backends,
+    InferenceBackendName
+)
+from live_whisper_gui.live_whisper.progress import ProgressReporter
+
+
+if TYPE_CHECKING:
+    from live_whisper_gui.gui.threads import InitializationThread
+
+
+class InferenceBackend:
+    """
+    Base class for engines running Whisper models.
+
+    Attributes
+    ----------
+    model
+        Loaded model. None until load() is called.
+    model_name: str
+        Name of the model. None until download() is called.
+    """
+    def __init__(self):
+        self.model = None
+        self.model_name = None
+
+    def download(self, qt_thread: InitializationThread, name: str) -> str:
+        """
+        Downloads a model if it's not cached yet.
+
+        Parameters
+        ----------
+        qt_thread: InitializationThread
+            Associated thread to communicate with the GUI.
+        name: str
+            Name of a Whisper model to download.
+
+        Returns
+        -------
+        str
+            Path or name to pass to the load() method.
+        """
+        raise NotImplementedError
+
+    def load(self, model_path: str, progress: ProgressReporter = None):
+        """
+        Loads a downloaded model to RAM.
+
+        Parameters
+        ----------
+        model_path: str
+            Value returned by the download() method.
+        progress: ProgressReporter
+            Reporter of loading stages.
+        """
+        raise NotImplementedError
+
+    def transcribe(
+            self,
+            audio: np.ndarray,
+            language: str = None,
+            task: str = "transcribe",
+            prompt: str = None
+    ) -> dict:
+        """
+        Transcribes an audio.
+
+        Parameters
+        ----------
+        audio: np.ndarray
+            One-dimensional float32 audio with Whisper's sample rate.
+        language: str
+            Language of the speech. Detected by the model if None.
+        task: str
+            "transcribe" or "translate" (to English).
+        prompt: str
+            Text preceding the speech or terms it may contain,
+            passed to the model as an initial prompt.
+
+        Returns
+        -------
+        dict
+            Result with at least the "text" key. Backends also return
+            "language", "avg_logprob" (mean log probability of decoded
+            tokens, None if nothing was decoded) and, when the language
+            was detected, its "language_probability" and, if known,
+            "language_detection_sec". "retries" is the number of times
+            decoding was repeated with a higher temperature. "skipped"
+            is True if the audio wasn't decoded, because it had no speech.
+            "looped" is True if decoding was stopped, because the text
+            started repeating itself, and the repetitions were removed.
+        """
+        raise NotImplementedError
+
+    def transcribe_batch(
+            self,
+            audios: list[np.ndarray],
+            language: str = None,
+            task: str = "transcribe",
+            prompt: str = None
+    ) -> list[dict]:
+        """
+        Transcribes several audios. Backends which can run them
+        as one batch override this method.
+
+        Parameters
+        ----------
+        audios: list[np.ndarray]
+            One-dimensional float32 audios with Whisper's sample rate.
+            Other parameters are the same as in transcribe().
+
+        Returns
+        -------
+        list[dict]
+            Results in the order of the audios.
+        """
+        return [
+            self.transcribe(audio, language, task, prompt)
+            for audio in audios
+        ]
+
+    def close(self):
+        """
+        Releases resources held besides the model, like connections.
+        Backends holding them override this method.
+        """
+
+
+def create_backend(name: InferenceBackendName) -> InferenceBackend:
+    """
+    Creates an inference backend. It runs in the model daemon
+    if the daemon is enabled.
+
+    Parameters
+    ----------
+    name: InferenceBackendName
+        Name of the backend to create.
+    """
+    if settings.MODEL_DAEMON or user_settings.model_daemon_enabled:
+        from live_whisper_gui.live_whisper.remote import RemoteBackend
+
+        if name not in inference_backends:
+            raise EnvironmentError(
+                f"There is no inference backend called {name}"
+            )
+        return RemoteBackend(name)
+    return create_local_backend(name)
+
+
+def create_local_backend(name: InferenceBackendName) -> InferenceBackend:
+    """
+    Creates an inference backend running in this process.
+
+    Parameters
+    ----------
+    name: InferenceBackendName
+        Name of the backend to create.
+    """
+    # Local backends import torch or CTranslate2, which takes seconds,
+    # so they are imported only when a model is run in this process.
+    from live_whisper_gui.live_whisper.local_backends import (
+        INFERENCE_BACKENDS
+    )
+
+    if name not in INFERENCE_BACKENDS:
+        raise EnvironmentError(f"There is no inference backend called {name}")
+    return INFERENCE_BACKENDS[name]()
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class AudioBuffer:
+    """
+    Fixed-capacity buffer collecting an utterance from incoming audio blocks.
+    All the memory is allocated once, so the audio callback doesn't
+    allocate anything while appending blocks.
+
+    Attributes
+    ----------
+    capacity: int
+        Maximum number of samples the buffer can hold.
+    length: int
+        Number of samples currently collected.
+    generation: int
+        Number of the current utterance. Changes every time the buffer
+        is started or cleared, so readers from other threads can detect
+        that a snapshot was taken while the utterance was replaced.
+    """
+    def __init__(self, capacity: int, block_size: int, channels: int = 1):
+        """
+        Parameters
+        ----------
+        capacity: int
+            Maximum number of samples the buffer can hold.
+        block_size: int
+            Number of samples in one block coming from the input device.
+            Defines the size of the pre-roll.
+        channels: int
+            Number of channels of the input device.
+        """
+        self.capacity = capacity
+        self.length = 0
+        self.generation = 0
+        self._data = np.zeros((capacity, channels), dtype=np.float32)
+        self._preroll = np.zeros((block_size, channels), dtype=np.float32)
+        self._preroll_length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def is_full(self) -> bool:
+        return self.length >= self.capacity
+
+    def keep_preroll(self, block: np.ndarray):
+        """
+        Remembers a block preceding an utterance, so the beginning
+        of the speech isn't cut off once it starts.
+
+        Parameters
+        ----------
+        block: np.ndarray
+            The last block received from the input device.
+        """
+        block = block[-len(self._preroll):]
+        self._preroll[:len(block)] = block
+        self._preroll_length = len(block)
+
+    def start(self):
+        """
+        Starts collecting a new utterance with the pre-roll at its beginning.
+        """
+        self.length = 0
+        self.generation += 1
+        self.append(self._preroll[:self._preroll_length])
+
+    def append(self, block: np.ndarray):
+        """
+        Appends a block to the collected utterance.
+        Samples which don't fit into the buffer are discarded.
+
+        Parameters
+        ----------
+        block: np.ndarray
+            A block received from the input device.
+        """
+        size = min(len(block), self.capacity - self.length)
+        self._data[self.length:self.length + size] = block[:size]
+        self.length += size
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns a copy of the collected utterance.
+        """
+        return self._data[:self.length].copy()
+
+    def clear(self):
+        """
+        Drops the collected utterance.
+        """
+        self.length = 0
+        self.generation += 1
@@ -0,0 +1,106 @@
+import re
+
+
+class TranscriptContext:
+    """
+    Rolling context of the transcription. Recent text and glossary terms
+    are passed to Whisper as a prompt, so a segment isn't decoded cold
+    and spelling of names and terms stays consistent. Words repeated
+    at the start of a segment, because the previous one ended with them,
+    are removed.
+
+    Attributes
+    ----------
+    words: list[str]
+        Recently transcribed words.
+    """
+    def __init__(
+            self,
+            max_words: int,
+            glossary: list[str] = (),
+            carry_over: bool = True,
+            min_overlap: int = 2
+    ):
+        """
+        Parameters
+        ----------
+        max_words: int
+            Number of recent words kept and passed as a prompt.
+        glossary: list[str]
+            Domain terms always passed as a prompt.
+        carry_over: bool
+            Pass recent words as a prompt. Only the glossary is passed
+            if it's False, but repeated words are still removed.
+        min_overlap: int
+            Minimum number of repeated words to remove.
+        """
+        self.max_words = max_words
+        self.glossary = list(glossary)
+        self.carry_over = carry_over
+        self.min_overlap = min_overlap
+        self.words = []
+
+    def prompt(self) -> str | None:
+        """
+        Returns a prompt for the next segment or None if there is nothing
+        to prompt with.
+        """
+        parts = []
+        if self.glossary:
+            parts.append(", ".join(self.glossary) + ".")
+        if self.carry_over and self.words:
+            parts.append(" ".join(self.words))
+        return " ".join(parts) or None
+
+    def deduplicate(self, text: str) -> str:
+        """
+        Removes words at the start of a text that repeat the end
+        of the context.
+
+        Parameters
+        ----------
+        text: str
+            Transcription of a new segment.
+        """
+        words = text.split()
+        overlap = self._overlap(words)
+        if not overlap:
+            return text.strip()
+        return " ".join(words[overlap:])
+
+    def add(self, text: str) -> str:
+        """
+        Deduplicates a transcription of a new segment and appends it
+        to the context.
+
+        Parameters
+        ----------
+        text: str
+            Transcription of a new segment.
+
+        Returns
+        -------
+        str
+            Text without words repeating the context.
+        """
+        text = self.deduplicate(text)
+        self.words = (self.words + text.split())[-self.max_words:]
+        return text
+
+    def _overlap(self, words: list[str]) -> int:
+        """
+        Returns length of the longest start of the words
+        which matches the end of the context.
+        """
+        context = [self._normalize(word) for word in self.words]
+        words = [self._normalize(word) for word in words]
+        for length in range(min(len(context), len(words)), 0, -1):
+            if length < self.min_overlap:
+                break
+            if context[-length:] == words[:length]:
+                return length
+        return 0
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return re.sub(r"\W", "", word).lower()
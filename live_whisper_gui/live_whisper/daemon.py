@@ -0,0 +1,353 @@
+"""
+Model daemon, which keeps a model loaded between launches of the
+application. Clients connect to it through a Unix socket, send audio
+segments and receive transcriptions. It's started by the first client
+and exits when no clients are connected for the idle timeout.
+The client side is in the remote module.
+
+Usage: python -m live_whisper_gui.live_whisper.daemon [--socket PATH]
+       [--idle-timeout SEC]
+"""
+from __future__ import annotations
+import argparse
+import fcntl
+import gc
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from live_whisper_gui.settings import settings, user_settings
+from live_whisper_gui.live_whisper.parallelism import pin_current_thread
+from live_whisper_gui.live_whisper.remote import (
+    receive_message,
+    send_message
+)
+
+
+if TYPE_CHECKING:
+    from live_whisper_gui.live_whisper.backends import InferenceBackend
+
+
+# Keys of a transcription result sent to clients.
+TRANSCRIPTION_KEYS = (
+    "text",
+    "language",
+    "language_probability",
+    "language_detection_sec",
+    "avg_logprob",
+    "no_speech_prob",
+    "retries",
+    "looped",
+    "skipped",
+)
+
+
+# Keys of a load request the backend is loaded with.
+BACKEND_CONFIG_KEYS = (
+    "backend",
+    "model_path",
+    "quantize_model",
+    "num_threads",
+    "num_interop_threads",
+    "cpu_affinity",
+)
+# Keys of the config which apply to the whole process.
+PROCESS_OPTION_KEYS = ("num_threads", "num_interop_threads", "cpu_affinity")
+
+
+class ModelDaemon:
+    """
+    Server keeping models loaded for its clients. Every client
+    transcribes with the backend loaded with its own config, and
+    clients with the same config share one. Transcriptions are run
+    one at a time. A new model is loaded while the current ones keep
+    serving clients. Backends without clients are unloaded, except
+    the last one, which is kept for the next launch of the application.
+
+    Thread counts and CPU affinity apply to the whole process. They come
+    from the client loading a model, and can't be changed while clients
+    of other processes are connected.
+
+    Attributes
+    ----------
+    backends: dict[tuple, InferenceBackend]
+        Backends with loaded models by their configs.
+    options: dict
+        Thread counts and CPU affinity the process runs with.
+        None until a client loads a model.
+    clients: int
+        Number of connected clients.
+    """
+    def __init__(self, socket_path: Path, idle_timeout: float):
+        """
+        Parameters
+        ----------
+        socket_path: Path
+            Path of the socket to listen to.
+        idle_timeout: float
+            Seconds without connected clients to exit after.
+        """
+        self.socket_path = Path(socket_path)
+        self.idle_timeout = idle_timeout
+        self.backends = {}
+        self.options = None
+        self.clients = 0
+        self._users = {}
+        self._client_pids = []
+        self._idle_since = time.monotonic()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._transcribe_lock = threading.Lock()
+
+    def serve(self):
+        """
+        Accepts clients until the daemon has been idle for the timeout.
+        Does nothing if another daemon is already starting or listening
+        to the socket.
+        """
+        lock_path = self.socket_path.with_suffix(".lock")
+        # Other users mustn't connect, as clients load models by any path.
+        umask = os.umask(0o077)
+        try:
+            lock_file = open(lock_path, "a")
+        finally:
+            os.umask(umask)
+        with lock_file:
+            try:
+                # Held while serving, so only one daemon binds the socket.
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            self._serve()
+
+    def _serve(self):
+        # The socket was left by a daemon which hasn't exited cleanly.
+        self.socket_path.unlink(missing_ok=True)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            umask = os.umask(0o077)
+            try:
+                server.bind(str(self.socket_path))
+            finally:
+                os.umask(umask)
+            try:
+                server.listen()
+                server.settimeout(1)
+                while not self._idle():
+                    try:
+                        connection, _ = server.accept()
+                    except socket.timeout:
+                        continue
+                    connection.settimeout(None)
+                    with self._lock:
+                        self.clients += 1
+                    threading.Thread(
+                        target=self._serve_client,
+                        args=(connection,),
+                        daemon=True
+                    ).start()
+            finally:
+                self.socket_path.unlink(missing_ok=True)
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return (
+                self.clients == 0
+                and time.monotonic() - self._idle_since > self.idle_timeout
+            )
+
+    def _serve_client(self, connection: socket.socket):
+        client = _Client()
+        try:
+            with connection:
+                while True:
+                    message, payload = receive_message(connection)
+                    self._handle(connection, client, message, payload)
+        except OSError:
+            pass
+        finally:
+            self._attach(client, None)
+            with self._lock:
+                self.clients -= 1
+                self._idle_since = time.monotonic()
+
+    def _handle(
+            self,
+            connection: socket.socket,
+            client: _Client,
+            message: dict,
+            payload: bytes
+    ):
+        def send_progress(stage: str, progress: int, total: int):
+            send_message(connection, {"progress": [stage, progress, total]})
+
+        try:
+            command = message.get("command")
+            if command == "ping":
+                result = None
+            elif command == "download":
+                result = self._download(message, send_progress)
+            elif command == "load":
+                result = self._load(client, message, send_progress)
+            elif command == "transcribe":
+                result = self._transcribe(client, message, payload)
+            else:
+                raise ValueError(f"Unknown command {command}")
+        except Exception as error:
+            send_message(connection, {"error": str(error)})
+        else:
+            send_message(connection, {"result": result})
+
+    @staticmethod
+    def _download(
+            message: dict,
+            send_progress: Callable[[str, int, int], None]
+    ) -> str:
+        from live_whisper_gui.live_whisper.backends import create_local_backend
+
+        if os.path.isfile(message["model"]):
+            return message["model"]
+        backend = create_local_backend(message["backend"])
+        return backend.download(
+            _ProgressSender(send_progress), message["model"]
+        )
+
+    def _load(
+            self,
+            client: _Client,
+            message: dict,
+            send_progress: Callable[[str, int, int], None]
+    ):
+        from live_whisper_gui.live_whisper.backends import create_local_backend
+        from live_whisper_gui.live_whisper.progress import ProgressReporter
+
+        config = {key: message.get(key) for key in BACKEND_CONFIG_KEYS}
+        options = {key: config[key] for key in PROCESS_OPTION_KEYS}
+        key = tuple(config.values())
+        with self._load_lock:
+            client.pid = message.get("pid")
+            if options != self.options:
+                with self._lock:
+                    other_pids = set(self._client_pids) - {client.pid}
+                if self.options is not None and other_pids:
+                    raise RuntimeError(
+                        "Model daemon runs with other thread counts or CPU "
+                        "affinity for other clients"
+                    )
+                # Options of the client's command line and environment.
+                settings.TORCH_NUM_THREADS = options["num_threads"]
+                settings.TORCH_INTEROP_THREADS = (
+                    options["num_interop_threads"]
+                )
+                settings.WORKER_CPU_AFFINITY = options["cpu_affinity"]
+                self.options = options
+            backend = self.backends.get(key)
+            if backend is None:
+                user_settings.quantize_model = config["quantize_model"]
+                pin_current_thread()
+                backend = create_local_backend(config["backend"])
+                backend.model_name = message["model_name"]
+                backend.load(
+                    config["model_path"], ProgressReporter(send_progress)
+                )
+            self._attach(client, key, backend)
+
+    def _attach(
+            self,
+            client: _Client,
+            key: tuple | None,
+            backend: InferenceBackend = None
+    ):
+        """
+        Makes a client use the backend with the config, or no backend
+        if the key is None, and unloads backends left without clients.
+        """
+        with self._lock:
+            if client.backend_key is not None:
+                self._users[client.backend_key] -= 1
+                self._client_pids.remove(client.pid)
+            client.backend_key = key
+            if key is not None:
+                self.backends[key] = backend
+                self._users[key] = self._users.get(key, 0) + 1
+                self._client_pids.append(client.pid)
+            unused = [key for key, users in self._users.items() if not users]
+            if len(unused) == len(self._users):
+                # The last backend stays loaded for the next launch.
+                unused = unused[:-1]
+            for unused_key in unused:
+                del self._users[unused_key], self.backends[unused_key]
+        if unused:
+            gc.collect()
+
+    def _transcribe(
+            self,
+            client: _Client,
+            message: dict,
+            payload: bytes
+    ) -> list[dict]:
+        with self._lock:
+            backend = self.backends.get(client.backend_key)
+        if backend is None:
+            raise RuntimeError("No model is loaded")
+        audio = np.frombuffer(payload, dtype=np.float32)
+        audios = np.split(audio, np.cumsum(message["lengths"])[:-1])
+        with self._transcribe_lock:
+            # Every client is served by its own thread.
+            pin_current_thread()
+            for key, value in message.get("user_settings", {}).items():
+                setattr(user_settings, key, value)
+            results = backend.transcribe_batch(
+                audios=audios,
+                language=message.get("language"),
+                task=message.get("task", "transcribe"),
+                prompt=message.get("prompt")
+            )
+        return [
+            {key: result.get(key) for key in TRANSCRIPTION_KEYS}
+            for result in results
+        ]
+
+
+class _Client:
+    """
+    State of a connected client.
+
+    Attributes
+    ----------
+    pid: int
+        Process ID of the client. None until it loads a model.
+    backend_key: tuple
+        Config of the backend the client uses. None until it loads a model.
+    """
+    def __init__(self):
+        self.pid = None
+        self.backend_key = None
+
+
+class _ProgressSender:
+    """
+    Stand-in for InitializationThread passing messages to a client.
+    """
+    def __init__(self, send_progress: Callable[[str, int, int], None]):
+        self.sendMessage = send_progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--socket", default=settings.MODEL_DAEMON_SOCKET)
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=settings.MODEL_DAEMON_IDLE_TIMEOUT_SEC
+    )
+    args = parser.parse_args()
+    ModelDaemon(args.socket, args.idle_timeout).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,553 @@
+import math
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from whisper.audio import (
+    FRAMES_PER_SECOND,
+    HOP_LENGTH,
+    N_FRAMES,
+    N_SAMPLES,
+    log_mel_spectrogram
+)
+from whisper.decoding import (
+    DecodingOptions,
+    DecodingResult,
+    DecodingTask,
+    LogitFilter,
+    detect_language
+)
+from whisper.model import Whisper
+from whisper.tokenizer import get_tokenizer
+from whisper.utils import compression_ratio
+
+
+# Same as defaults of Whisper's transcribe().
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+# Decoded tokens loop if they end with an n-gram of up to LOOP_MAX_NGRAM
+# tokens repeated at least LOOP_MIN_REPEATS times, LOOP_MIN_TOKENS
+# tokens in total.
+LOOP_MAX_NGRAM = 16
+LOOP_MIN_REPEATS = 3
+LOOP_MIN_TOKENS = 12
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    """
+    Options of decoding a segment. Decoding is repeated with the next
+    temperature while the text is too repetitive or unlikely.
+
+    Attributes
+    ----------
+    temperatures: tuple[float, ...]
+        Temperatures to try one by one.
+    beam_size: int
+        Number of beams of the beam search at zero temperature.
+        Greedy decoding is used if None.
+    best_of: int
+        Number of samples to choose from at non-zero temperatures.
+    sample_len: int
+        Maximum number of decoded tokens. Whisper's limit if None.
+    condition_on_previous_text: bool
+        Prompt each 30-second window of a long audio with the text
+        of the previous one.
+    """
+    temperatures: tuple[float, ...]
+    beam_size: int = None
+    best_of: int = None
+    sample_len: int = None
+    condition_on_previous_text: bool = False
+
+
+DECODING_PROFILES: dict[str, DecodingProfile] = {
+    "lowest_latency": DecodingProfile(temperatures=(0.0,), sample_len=96),
+    "balanced": DecodingProfile(temperatures=(0.0, 0.4, 0.8)),
+    "accurate": DecodingProfile(
+        temperatures=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        beam_size=5,
+        best_of=5,
+        condition_on_previous_text=True
+    ),
+}
+
+
+class AudioContextModel:
+    """
+    Whisper model as seen by whisper.decoding, with a shorter audio
+    context. Decoding functions take audio features of that length
+    as already encoded, instead of encoding them again.
+    """
+    def __init__(self, model: Whisper, n_audio_ctx: int):
+        self._model = model
+        self.dims = replace(model.dims, n_audio_ctx=n_audio_ctx)
+
+    def __getattr__(self, name: str):
+        return getattr(self._model, name)
+
+
+class LoopFilter(LogitFilter):
+    """
+    Ends decoding of sequences with the end of text as soon as they
+    start looping ("you you you ..."), while Whisper decodes them
+    up to the length limit and only then sees the loop
+    by the compression ratio of the text.
+    """
+    def __init__(self, eot: int, sample_begin: int):
+        """
+        Parameters
+        ----------
+        eot: int
+            The end of text token.
+        sample_begin: int
+            Index of the first decoded token.
+        """
+        self.eot = eot
+        self.sample_begin = sample_begin
+
+    def apply(self, logits: torch.Tensor, tokens: torch.Tensor):
+        looping = loop_periods(tokens[:, self.sample_begin:]) > 0
+        looping &= tokens[:, -1] != self.eot
+        if looping.any():
+            logits[looping] = -np.inf
+            logits[looping, self.eot] = 0
+
+
+class NoSpeechFilter(LogitFilter):
+    """
+    Ends decoding at its first step for audios in which Whisper's
+    probability of no speech is higher than a threshold. The probability
+    is taken from logits of the first step like decode() does, so the gate
+    costs no separate pass of the decoder.
+
+    Attributes
+    ----------
+    no_speech_probs: list[float]
+        Probabilities of no speech for every decoded sequence.
+        None until the first step.
+    """
+    no_speech_probs: list[float] = None
+
+    def __init__(self, task: DecodingTask, threshold: float):
+        """
+        Parameters
+        ----------
+        task: DecodingTask
+            Task to end decoding of. Its logits are watched
+            for the first step.
+        threshold: float
+            Probability of no speech to end decoding above.
+        """
+        self.threshold = threshold
+        self.eot = task.tokenizer.eot
+        self.no_speech = task.tokenizer.no_speech
+        self.sot_index = task.sot_index
+        self.sample_begin = task.sample_begin
+        self._logits = task.inference.logits
+        task.inference.logits = self._watch_logits
+
+    def apply(self, logits: torch.Tensor, tokens: torch.Tensor):
+        if tokens.shape[1] != self.sample_begin:
+            return
+        skipped = torch.tensor(self.no_speech_probs) > self.threshold
+        if skipped.all():
+            # Beam search would go on with the other beams, so decoding
+            # is interrupted instead of ending it with the end of text.
+            raise NoSpeech
+        if skipped.any():
+            logits[skipped] = -np.inf
+            logits[skipped, self.eot] = 0
+
+    def _watch_logits(
+            self,
+            tokens: torch.Tensor,
+            audio_features: torch.Tensor
+    ) -> torch.Tensor:
+        logits = self._logits(tokens, audio_features)
+        if tokens.shape[1] == self.sample_begin:
+            probabilities = logits[:, self.sot_index].float().softmax(dim=-1)
+            self.no_speech_probs = probabilities[:, self.no_speech].tolist()
+        return logits
+
+
+class NoSpeech(Exception):
+    """
+    Raised by NoSpeechFilter when no decoded audio contains speech.
+    """
+
+
+def loop_periods(tokens: torch.Tensor) -> torch.Tensor:
+    """
+    Returns length of the shortest n-gram each sequence of tokens
+    ends looping with, 0 if it doesn't loop.
+
+    Parameters
+    ----------
+    tokens: torch.Tensor
+        Decoded tokens of shape (batch, length).
+    """
+    periods = torch.zeros(len(tokens), dtype=torch.long)
+    # Only periods after which the last token repeats are checked.
+    repeated = (
+        tokens[:, -LOOP_MAX_NGRAM - 1:-1] == tokens[:, -1:]
+    ).any(dim=0).tolist()
+    for period in range(len(repeated), 0, -1):
+        if not repeated[-period]:
+            continue
+        span = period * max(
+            LOOP_MIN_REPEATS, math.ceil(LOOP_MIN_TOKENS / period)
+        )
+        if tokens.shape[1] < span:
+            continue
+        tail = tokens[:, -span:]
+        periods[(tail[:, period:] == tail[:, :-period]).all(dim=1)] = period
+    return periods
+
+
+def cut_loop(tokens: list[int]) -> list[int] | None:
+    """
+    Returns decoded tokens without repetitions of the n-gram they end
+    looping with, keeping its first occurrence. None if they don't loop.
+    """
+    period = int(loop_periods(torch.tensor([tokens]))[0])
+    if not period:
+        return None
+    start = len(tokens) - period
+    while start > 0 and tokens[start - 1] == tokens[start - 1 + period]:
+        start -= 1
+    return tokens[:start + period]
+
+
+def context_frames(
+        num_samples: int,
+        bucket_sec: float,
+        padding_sec: float = 0.
+) -> int:
+    """
+    Returns number of mel frames to encode an audio with.
+    It's the length of the audio with the padding, rounded up
+    to the bucket, but not more than Whisper's 30 seconds.
+
+    Parameters
+    ----------
+    num_samples: int
+        Length of the audio in samples.
+    bucket_sec: float
+        Step of possible lengths. Fewer lengths mean steadier latency.
+    padding_sec: float
+        Silence the audio must be followed by.
+    """
+    bucket = max(2, round(bucket_sec * FRAMES_PER_SECOND) // 2 * 2)
+    needed = num_samples / HOP_LENGTH + padding_sec * FRAMES_PER_SECOND
+    return min(math.ceil(needed / bucket) * bucket, N_FRAMES)
+
+
+def log_mel(model: Whisper, audio: torch.Tensor, n_frames: int):
+    """
+    Returns the first frames of the log-mel spectrogram of an audio,
+    padded with silence like in Whisper's transcribe().
+    """
+    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    return mel[:, :n_frames]
+
+
+@torch.no_grad()
+def encode(model: Whisper, mel: torch.Tensor):
+    """
+    Encodes mel spectrograms of any even number of frames up to 30 seconds,
+    like whisper.cpp's audio_ctx option. The encoder costs in proportion
+    to the number of frames, while Whisper always encodes 30 seconds.
+
+    Parameters
+    ----------
+    model: Whisper
+        Loaded model.
+    mel: torch.Tensor
+        Batch of mel spectrograms of shape (batch, n_mels, n_frames).
+
+    Returns
+    -------
+    torch.Tensor
+        Audio features of shape (batch, n_frames // 2, n_audio_state).
+    """
+    encoder = model.encoder
+    x = F.gelu(encoder.conv1(mel))
+    x = F.gelu(encoder.conv2(x))
+    x = x.permute(0, 2, 1)
+    x = (x + encoder.positional_embedding[:x.shape[1]]).to(x.dtype)
+    for block in encoder.blocks:
+        x = block(x)
+    return encoder.ln_post(x)
+
+
+def transcribe(
+        model: Whisper,
+        audio: np.ndarray,
+        bucket_sec: float,
+        padding_sec: float = 0.,
+        language: str = None,
+        task: str = "transcribe",
+        prompt: str = None,
+        profile: DecodingProfile = DECODING_PROFILES["balanced"],
+        no_speech_threshold: float = None,
+        cut_loops: bool = False
+) -> dict:
+    """
+    Transcribes an audio of up to 30 seconds with a reduced audio context.
+    The audio is encoded once; decoding is retried with higher
+    temperatures of the profile like in Whisper's transcribe().
+
+    Parameters
+    ----------
+    model: Whisper
+        Loaded model.
+    audio: np.ndarray
+        One-dimensional float32 audio with Whisper's sample rate.
+    bucket_sec: float
+        Step of lengths of the audio context.
+    padding_sec: float
+        Silence encoded after the audio.
+    language: str
+        Language of the speech. Detected if None.
+    task: str
+        "transcribe" or "translate" (to English).
+    prompt: str
+        Text passed to the model as an initial prompt.
+    profile: DecodingProfile
+        Options of decoding.
+    no_speech_threshold: float
+        Decoding of the audio ends at its first step if Whisper's
+        probability of no speech in it is higher. Never ends if None.
+    cut_loops: bool
+        Stop decoding a text as soon as it loops, and keep it
+        without the repetitions instead of decoding it again.
+
+    Returns
+    -------
+    dict
+        Result with keys like InferenceBackend.transcribe() returns.
+    """
+    return transcribe_batch(
+        model,
+        [audio],
+        bucket_sec,
+        padding_sec,
+        language,
+        task,
+        prompt,
+        profile,
+        no_speech_threshold,
+        cut_loops
+    )[0]
+
+
+def transcribe_batch(
+        model: Whisper,
+        audios: list[np.ndarray],
+        bucket_sec: float,
+        padding_sec: float = 0.,
+        language: str = None,
+        task: str = "transcribe",
+        prompt: str = None,
+        profile: DecodingProfile = DECODING_PROFILES["balanced"],
+        no_speech_threshold: float = None,
+        cut_loops: bool = False
+) -> list[dict]:
+    """
+    Transcribes audios of up to 30 seconds as one batch, see transcribe().
+    All audios are encoded with the context of the longest one.
+    Audios in different languages are decoded in separate batches,
+    and only audios which need a higher temperature are decoded again.
+
+    Parameters
+    ----------
+    audios: list[np.ndarray]
+        One-dimensional float32 audios with Whisper's sample rate.
+        Other parameters are the same as in transcribe().
+
+    Returns
+    -------
+    list[dict]
+        Results in the order of the audios.
+    """
+    n_frames = max(
+        context_frames(len(audio), bucket_sec, padding_sec)
+        for audio in audios
+    )
+    mel = torch.stack([
+        log_mel(model, torch.from_numpy(audio), n_frames)
+        for audio in audios
+    ])
+    features = encode(model, mel)
+    context_model = AudioContextModel(model, features.shape[1])
+
+    results = [{"audio_context_frames": n_frames} for _ in audios]
+    languages = [language or "en"] * len(audios)
+    if language is None and model.is_multilingual:
+        start = time.perf_counter()
+        _, probabilities = detect_language(context_model, features)
+        detection_sec = (time.perf_counter() - start) / len(audios)
+        for index, language_probabilities in enumerate(probabilities):
+            languages[index] = max(
+                language_probabilities, key=language_probabilities.get
+            )
+            results[index]["language_probability"] = (
+                language_probabilities[languages[index]]
+            )
+            results[index]["language_detection_sec"] = detection_sec
+
+    for batch_language in dict.fromkeys(languages):
+        indices = [
+            index for index, item_language in enumerate(languages)
+            if item_language == batch_language
+        ]
+        decoded = _decode_with_fallback(
+            context_model,
+            features[indices],
+            batch_language,
+            task,
+            prompt,
+            profile,
+            no_speech_threshold,
+            cut_loops
+        )
+        for index, item in zip(indices, decoded):
+            if item.get("skipped"):
+                results[index].pop("language_probability", None)
+            results[index].update(item, language=batch_language)
+    return results
+
+
+def _decode_with_fallback(
+        model: AudioContextModel,
+        features: torch.Tensor,
+        language: str,
+        task: str,
+        prompt: str,
+        profile: DecodingProfile,
+        no_speech_threshold: float | None,
+        cut_loops: bool
+) -> list[dict]:
+    results = [None] * len(features)
+    pending = list(range(len(features)))
+    for retries, temperature in enumerate(profile.temperatures):
+        # Probabilities of no speech don't depend on the temperature.
+        threshold = no_speech_threshold if not retries else None
+        options = DecodingOptions(
+            task=task,
+            language=language,
+            temperature=temperature,
+            sample_len=profile.sample_len,
+            best_of=profile.best_of if temperature > 0 else None,
+            beam_size=profile.beam_size if temperature == 0 else None,
+            prompt=prompt,
+            without_timestamps=True,
+            fp16=False
+        )
+        if (options.beam_size or options.best_of or 1) > 1:
+            # Whisper's decode() doesn't repeat audio features of a batch
+            # for beams or samples, so only single audios are decoded.
+            decoded = [
+                _decode(
+                    model,
+                    features[index:index + 1],
+                    options,
+                    threshold,
+                    cut_loops
+                )[0]
+                for index in pending
+            ]
+        else:
+            decoded = _decode(
+                model, features[pending], options, threshold, cut_loops
+            )
+        failed = []
+        for index, (item, looped) in zip(pending, decoded):
+            if threshold is not None and item.no_speech_prob > threshold:
+                results[index] = {
+                    "text": "",
+                    "avg_logprob": None,
+                    "no_speech_prob": item.no_speech_prob,
+                    "retries": 0,
+                    "looped": False,
+                    "skipped": True,
+                }
+                continue
+            silent = (
+                item.no_speech_prob > NO_SPEECH_THRESHOLD
+                and item.avg_logprob < LOGPROB_THRESHOLD
+            )
+            results[index] = {
+                "text": "" if silent else item.text,
+                "avg_logprob": item.avg_logprob,
+                "no_speech_prob": item.no_speech_prob,
+                "temperature": temperature,
+                "retries": retries,
+                "looped": looped,
+            }
+            if not silent and (
+                item.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                or item.avg_logprob < LOGPROB_THRESHOLD
+            ):
+                failed.append(index)
+        pending = failed
+        if not pending:
+            break
+    return results
+
+
+def _decode(
+        model: AudioContextModel,
+        features: torch.Tensor,
+        options: DecodingOptions,
+        no_speech_threshold: float | None,
+        cut_loops: bool
+) -> list[tuple[DecodingResult, bool]]:
+    """
+    Decodes encoded audios like Whisper's decode(). Audios with
+    the probability of no speech above the threshold are returned
+    without text. If loops are cut, texts which looped are returned
+    without the repetitions, with True next to them.
+    """
+    task = DecodingTask(model, options)
+    if no_speech_threshold is not None:
+        no_speech_filter = NoSpeechFilter(task, no_speech_threshold)
+        task.logit_filters.insert(0, no_speech_filter)
+    if cut_loops:
+        task.logit_filters.append(
+            LoopFilter(task.tokenizer.eot, task.sample_begin)
+        )
+    try:
+        decoded = task.run(features)
+    except NoSpeech:
+        decoded = [
+            DecodingResult(
+                audio_features=item_features,
+                language=options.language,
+                no_speech_prob=no_speech_prob,
+                temperature=options.temperature
+            )
+            for item_features, no_speech_prob in zip(
+                features,
+                no_speech_filter.no_speech_probs[::task.n_group]
+            )
+        ]
+    if not cut_loops:
+        return [(item, False) for item in decoded]
+    results = []
+    for item in decoded:
+        tokens = cut_loop(item.tokens)
+        if tokens is not None:
+            text = task.tokenizer.decode(tokens).strip()
+            item = replace(
+                item,
+                tokens=tokens,
+                text=text,
+                compression_ratio=compression_ratio(text)
+            )
+        results.append((item, tokens is not None))
+    return results
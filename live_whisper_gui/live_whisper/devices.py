@@ -0,0 +1,167 @@
+"""
+Enumeration of input devices. PortAudio scans host APIs once, when it's
+initialized, so devices connected later are only seen by a new process
+or after reinitialization.
+
+Usage: python -m live_whisper_gui.live_whisper.devices [--serve]
+       (prints names of input devices as a JSON list, with --serve
+       once for every line read from stdin)
+"""
+import json
+import queue
+import subprocess
+import sys
+import threading
+from typing import IO
+
+from live_whisper_gui.settings import settings
+from live_whisper_gui.live_whisper.subprocesses import (
+    module_command,
+    module_environment
+)
+
+
+# Serializes queries of PortAudio of this process with its
+# reinitialization, which may be run by another thread.
+_portaudio_lock = threading.RLock()
+
+
+def input_devices() -> list[str]:
+    """
+    Returns names of input devices known to PortAudio of this process.
+    The first call initializes PortAudio, which can take a while.
+    """
+    import sounddevice
+
+    with _portaudio_lock:
+        devices = sounddevice.query_devices()
+    return [
+        device['name'] for device in devices
+        if device['max_input_channels'] > 0
+    ]
+
+
+class DeviceEnumerator:
+    """
+    Enumerates input devices currently connected to the system
+    in a worker process, so streams opened by this one are not
+    interrupted. The worker is started on first use and reused
+    by later enumerations, until it's closed.
+    """
+    def __init__(self):
+        self._process = None
+        self._lines = None
+        self._lock = threading.Lock()
+
+    def input_devices(self) -> list[str]:
+        """
+        Returns names of input devices. Raises EnvironmentError
+        if the worker doesn't answer within the timeout.
+        """
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            try:
+                self._process.stdin.write(b"\n")
+                self._process.stdin.flush()
+                line = self._lines.get(
+                    timeout=settings.DEVICE_ENUMERATION_TIMEOUT_SEC
+                )
+            except (OSError, queue.Empty):
+                line = b""
+            if not line:
+                self._stop()
+                raise EnvironmentError("Input devices can't be enumerated")
+            return json.loads(line)
+
+    def close(self):
+        """
+        Stops the worker process. It's started again when needed.
+        """
+        with self._lock:
+            self._stop()
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            module_command("live_whisper_gui.live_whisper.devices", "--serve"),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=module_environment()
+        )
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=_read_lines,
+            args=(self._process.stdout, self._lines),
+            daemon=True
+        ).start()
+
+    def _stop(self):
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+
+def reinitialize_if_unknown(device: str = None):
+    """
+    Reinitializes PortAudio of this process if it doesn't know a device,
+    e.g. because it was connected after the start. Must be called
+    while no streams are open.
+
+    Parameters
+    ----------
+    device: str
+        Name of an input device. None means the default one.
+    """
+    import sounddevice
+
+    if device is None:
+        return
+    with _portaudio_lock:
+        try:
+            sounddevice.query_devices(device, 'input')
+        except ValueError:
+            _reinitialize()
+
+
+def serve():
+    """
+    Prints names of input devices as a JSON line for every line read
+    from stdin, until it's closed. PortAudio is reinitialized before
+    every enumeration but the first, so connected devices are found.
+    """
+    for index, _ in enumerate(sys.stdin):
+        if index:
+            _reinitialize()
+        print(json.dumps(input_devices()), flush=True)
+
+
+def _reinitialize():
+    import sounddevice
+
+    # sounddevice has no public API to rescan devices.
+    with _portaudio_lock:
+        sounddevice._terminate()
+        sounddevice._initialize()
+
+
+def _read_lines(stream: IO[bytes], lines: queue.Queue):
+    for line in stream:
+        lines.put(line)
+    lines.put(b"")
+
+
+device_enumerator = DeviceEnumerator()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--serve"]:
+        serve()
+    else:
+        json.dump(input_devices(), sys.stdout)
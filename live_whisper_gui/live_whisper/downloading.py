@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import urllib.error
+import urllib.request
+from http.client import HTTPException
+from typing import Callable
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MIN_READ_SIZE = 64 * 1024
+MAX_READ_SIZE = 4 * 1024 * 1024
+TARGET_READ_SEC = 0.1
+PROGRESS_INTERVAL_SEC = 0.2
+
+
+def download(
+        url: str,
+        target: str,
+        expected_sha256: str,
+        on_progress: Callable[[int, int], None] = None,
+        connections: int = 1,
+        retries: int = 5,
+        timeout: float = 30
+) -> bool:
+    """
+    Downloads a file to a "<target>.part" file, resuming it if it is left
+    from an interrupted download. The part file is renamed to the target
+    only when its checksum matches, otherwise it is deleted.
+    Returns True if the file has been downloaded and verified.
+
+    Parameters
+    ----------
+    url: str
+        URL of the file.
+    target: str
+        Path to save the file to.
+    expected_sha256: str
+        SHA256 checksum the file must have.
+    on_progress: Callable[[int, int], None]
+        Function called with number of downloaded and total bytes.
+    connections: int
+        Number of ranges downloaded in parallel, if the server supports it.
+    retries: int
+        How many times in a row to reconnect after a connection is dropped.
+    timeout: float
+        Timeout of connecting and reading in seconds.
+    """
+    on_progress = on_progress or (lambda downloaded, total: None)
+    part_path = f"{target}.part"
+    total, accepts_ranges = _probe(url, timeout)
+    if connections > 1 and accepts_ranges and total:
+        _download_segments(
+            url, part_path, total, connections, retries, timeout, on_progress
+        )
+        sha256 = file_sha256(part_path)
+    else:
+        sha256 = _download_sequentially(
+            url, part_path, total, accepts_ranges, retries, timeout,
+            on_progress
+        )
+    if sha256 != expected_sha256:
+        os.unlink(part_path)
+        return False
+    os.replace(part_path, target)
+    return True
+
+
+def file_sha256(
+        path: str,
+        on_progress: Callable[[int, int], None] = None
+) -> str:
+    """
+    Computes SHA256 checksum of a file without reading it to memory at once.
+    on_progress is called with number of hashed and total bytes.
+    """
+    sha256 = hashlib.sha256()
+    _hash_file(path, sha256, on_progress)
+    return sha256.hexdigest()
+
+
+def _hash_file(
+        path: str,
+        sha256,
+        on_progress: Callable[[int, int], None] = None
+) -> int:
+    total = os.path.getsize(path)
+    size = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+            size += len(chunk)
+            if on_progress is not None:
+                on_progress(size, total)
+    return size
+
+
+def _probe(url: str, timeout: float) -> tuple[int | None, bool]:
+    request = urllib.request.Request(url, method="HEAD")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            length = response.headers.get("Content-Length")
+            return (
+                int(length) if length else None,
+                response.headers.get("Accept-Ranges") == "bytes"
+            )
+    except urllib.error.HTTPError:
+        return None, False
+
+
+def _download_sequentially(
+        url: str,
+        part_path: str,
+        total: int | None,
+        accepts_ranges: bool,
+        retries: int,
+        timeout: float,
+        on_progress: Callable[[int, int], None]
+) -> str:
+    sha256 = hashlib.sha256()
+    position = 0
+    if accepts_ranges and os.path.isfile(part_path):
+        position = _hash_file(part_path, sha256)
+        if total and position > total:
+            sha256, position = hashlib.sha256(), 0
+    with open(part_path, "r+b" if position else "wb") as file:
+        file.seek(position)
+
+        def write(chunk: bytes):
+            nonlocal position
+            file.write(chunk)
+            sha256.update(chunk)
+            position += len(chunk)
+            on_progress(position, total or position)
+
+        _fetch_range(
+            url, position, total, write,
+            retries if accepts_ranges else 0, accepts_ranges, timeout
+        )
+    return sha256.hexdigest()
+
+
+def _download_segments(
+        url: str,
+        part_path: str,
+        total: int,
+        connections: int,
+        retries: int,
+        timeout: float,
+        on_progress: Callable[[int, int], None]
+):
+    state_path = f"{part_path}.json"
+    segments = _load_segments(url, part_path, state_path, total)
+    if segments is None:
+        size = -(-total // connections)
+        segments = [
+            [start, min(start + size, total), start]
+            for start in range(0, total, size)
+        ]
+        with open(part_path, "wb") as file:
+            file.truncate(total)
+    lock = threading.Lock()
+    errors = []
+
+    def worker(segment: list):
+        with open(part_path, "r+b") as file:
+            file.seek(segment[2])
+
+            def write(chunk: bytes):
+                file.write(chunk)
+                file.flush()
+                with lock:
+                    segment[2] += len(chunk)
+
+            try:
+                _fetch_range(
+                    url, segment[2], segment[1], write, retries, True, timeout
+                )
+            except Exception as error:
+                errors.append(error)
+
+    threads = [
+        threading.Thread(target=worker, args=(segment,), daemon=True)
+        for segment in segments
+        if segment[2] < segment[1]
+    ]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(PROGRESS_INTERVAL_SEC)
+        with lock:
+            _save_segments(url, state_path, total, segments)
+            downloaded = sum(
+                position - start for start, _, position in segments
+            )
+        on_progress(downloaded, total)
+    _save_segments(url, state_path, total, segments)
+    if errors:
+        raise errors[0]
+    os.unlink(state_path)
+
+
+def _load_segments(
+        url: str,
+        part_path: str,
+        state_path: str,
+        total: int
+) -> list | None:
+    if (
+        not os.path.isfile(part_path)
+        or os.path.getsize(part_path) != total
+    ):
+        return None
+    try:
+        with open(state_path) as file:
+            state = json.load(file)
+    except (OSError, json.decoder.JSONDecodeError):
+        return None
+    if state.get("url") != url or state.get("total") != total:
+        return None
+    return state["segments"]
+
+
+def _save_segments(url: str, state_path: str, total: int, segments: list):
+    with open(state_path, "w") as file:
+        json.dump({"url": url, "total": total, "segments": segments}, file)
+
+
+def _fetch_range(
+        url: str,
+        start: int,
+        end: int | None,
+        write: Callable[[bytes], None],
+        retries: int,
+        ranged: bool,
+        timeout: float
+):
+    """
+    Passes bytes from start to end (exclusive) of a file to the write
+    function, reconnecting from the last received byte when a connection
+    is dropped.
+    """
+    position = start
+    attempt = 0
+    while end is None or position < end:
+        request = urllib.request.Request(url)
+        if ranged:
+            last = end - 1 if end is not None else ""
+            request.add_header("Range", f"bytes={position}-{last}")
+        received = 0
+        finished = False
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                if ranged and response.status != 206:
+                    raise RuntimeError(
+                        f"Server does not support ranged requests to {url}"
+                    )
+                length = response.headers.get("Content-Length")
+                for chunk in _read_chunks(response):
+                    write(chunk)
+                    position += len(chunk)
+                    received += len(chunk)
+                # A dropped connection also ends reading without an error.
+                finished = length is None or received == int(length)
+        except urllib.error.HTTPError as error:
+            if error.code < 500:
+                raise
+        except (OSError, HTTPException):
+            pass
+        # Without the length, only the end of the response ends the file.
+        if end is None and finished:
+            return
+        if end is not None and position >= end:
+            return
+        attempt = 1 if received else attempt + 1
+        # Without ranges, the file can't continue from the received bytes.
+        if attempt > retries or (received and not ranged):
+            raise ConnectionError(f"Downloading of {url} has been interrupted")
+        time.sleep(min(2 ** attempt / 10, 5))
+
+
+def _read_chunks(response):
+    """
+    Reads a response in chunks, which grow while the connection is fast
+    and shrink when it slows down, so every read takes about the same time.
+    """
+    size = MIN_READ_SIZE
+    while True:
+        started = time.perf_counter()
+        chunk = response.read(size)
+        if not chunk:
+            return
+        elapsed = time.perf_counter() - started
+        if len(chunk) == size and elapsed < TARGET_READ_SEC / 2:
+            size = min(size * 2, MAX_READ_SIZE)
+        elif elapsed > TARGET_READ_SEC * 2:
+            size = max(size // 2, MIN_READ_SIZE)
+        yield chunk
@@ -0,0 +1,115 @@
+class LanguageLock:
+    """
+    Language of the speech, detected once and reused for the session.
+    Whisper detects the language of every segment it's not given one for,
+    which costs an extra encoder pass. The language is locked after
+    several confident detections agree on it, and detected again only
+    if transcriptions become unconfident or on request.
+
+    Attributes
+    ----------
+    language: str
+        Locked language. None while it's being detected.
+    detections_skipped: int
+        Number of segments transcribed with the locked language.
+    """
+    def __init__(
+            self,
+            confirmations: int,
+            min_probability: float,
+            min_avg_logprob: float,
+            max_unconfident: int
+    ):
+        """
+        Parameters
+        ----------
+        confirmations: int
+            Number of consecutive confident detections of the same
+            language required to lock it.
+        min_probability: float
+            Minimum probability of a confident detection.
+        min_avg_logprob: float
+            Transcriptions with a lower mean log probability of tokens
+            are unconfident.
+        max_unconfident: int
+            Number of consecutive unconfident transcriptions
+            after which the language is detected again.
+        """
+        self.confirmations = confirmations
+        self.min_probability = min_probability
+        self.min_avg_logprob = min_avg_logprob
+        self.max_unconfident = max_unconfident
+        self.language = None
+        self.detections_skipped = 0
+        self._candidates = []
+        self._unconfident = 0
+        self._detections = 0
+        self._detection_sec = 0.
+
+    def update(self, result: dict):
+        """
+        Takes a transcription into account.
+
+        Parameters
+        ----------
+        result: dict
+            Result of InferenceBackend.transcribe().
+        """
+        if self.language is None:
+            return self._detected(result)
+        self.detections_skipped += 1
+        avg_logprob = result.get("avg_logprob")
+        if avg_logprob is None:
+            return
+        if avg_logprob >= self.min_avg_logprob:
+            self._unconfident = 0
+            return
+        self._unconfident += 1
+        if self._unconfident >= self.max_unconfident:
+            self.unlock()
+
+    def unlock(self):
+        """
+        Makes the language be detected again.
+        """
+        self.language = None
+        self._candidates = []
+        self._unconfident = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the language and compute saved by locking it.
+        """
+        stats = {
+            "language": (
+                f"{self.language} (locked)" if self.language else "detecting"
+            ),
+            "language_detections_skipped": self.detections_skipped,
+        }
+        if self._detections:
+            detection_sec = self._detection_sec / self._detections
+            stats["language_detection_time_saved"] = (
+                f"{detection_sec * 1000:.0f} ms per segment, "
+                f"{detection_sec * self.detections_skipped:.1f} s total"
+            )
+        return stats
+
+    def _detected(self, result: dict):
+        probability = result.get("language_probability")
+        if probability is None:
+            return
+        if result.get("language_detection_sec") is not None:
+            self._detections += 1
+            self._detection_sec += result["language_detection_sec"]
+        if probability < self.min_probability:
+            self._candidates = []
+            return
+        self._candidates = (
+            self._candidates + [result["language"]]
+        )[-self.confirmations:]
+        if (
+            len(self._candidates) == self.confirmations
+            and len(set(self._candidates)) == 1
+        ):
+            self.language = result["language"]
+            self._unconfident = 0
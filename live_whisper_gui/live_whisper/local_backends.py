@@ -0,0 +1,215 @@
+from __future__ import annotations
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+import torch
+from whisper.audio import (
+    CHUNK_LENGTH,
+    N_SAMPLES,
+    log_mel_spectrogram,
+    pad_or_trim
+)
+
+from live_whisper_gui.settings import settings, user_settings
+from live_whisper_gui.live_whisper.backends import InferenceBackend
+from live_whisper_gui.live_whisper.model_download import model_download
+from live_whisper_gui.live_whisper.model_loading import load_model
+from live_whisper_gui.live_whisper.quantization import load_quantized
+from live_whisper_gui.live_whisper.progress import ProgressReporter
+from live_whisper_gui.live_whisper import decoding
+from live_whisper_gui.live_whisper.parallelism import (
+    configure_torch_threads,
+    num_threads
+)
+
+
+if TYPE_CHECKING:
+    from live_whisper_gui.gui.threads import InitializationThread
+
+
+class WhisperBackend(InferenceBackend):
+    """
+    Reference OpenAI Whisper implementation running in float32 PyTorch.
+    Linear layers are dynamically quantized to int8
+    if the quantize_model setting is enabled. Segments are encoded
+    with a reduced audio context if audio_context_bucket_sec is set.
+    Several segments are encoded and decoded as one batch. Segments
+    without speech according to the encoder aren't decoded, and texts
+    are decoded only until they start looping.
+    """
+    def download(self, qt_thread: InitializationThread, name: str) -> str:
+        self.model_name = name
+        return model_download(qt_thread=qt_thread, name=name)
+
+    def load(self, model_path: str, progress: ProgressReporter = None):
+        progress = progress or ProgressReporter()
+        configure_torch_threads()
+        if user_settings.quantize_model:
+            self.model = load_quantized(model_path, progress)
+        else:
+            progress.stage("Loading the model...")
+            self.model = load_model(model_path, progress.update)
+
+    def transcribe(
+            self,
+            audio: np.ndarray,
+            language: str = None,
+            task: str = "transcribe",
+            prompt: str = None
+    ) -> dict:
+        if len(audio) <= N_SAMPLES:
+            return self.transcribe_batch([audio], language, task, prompt)[0]
+        profile = _decoding_profile()
+        audio = torch.from_numpy(audio)
+        detection = {}
+        if language is None and self.model.is_multilingual:
+            detection = self._detect_language(audio)
+            language = detection["language"]
+        result = self.model.transcribe(
+            audio=audio,
+            fp16=False,
+            language=language,
+            task=task,
+            initial_prompt=prompt,
+            temperature=profile.temperatures,
+            condition_on_previous_text=profile.condition_on_previous_text,
+            beam_size=profile.beam_size,
+            best_of=profile.best_of,
+            sample_len=profile.sample_len
+        )
+        return {
+            **result,
+            **detection,
+            "avg_logprob": _mean([
+                segment["avg_logprob"] for segment in result["segments"]
+            ]),
+            "retries": sum(
+                profile.temperatures.index(segment["temperature"])
+                for segment in result["segments"]
+            ),
+        }
+
+    def transcribe_batch(
+            self,
+            audios: list[np.ndarray],
+            language: str = None,
+            task: str = "transcribe",
+            prompt: str = None
+    ) -> list[dict]:
+        if any(len(audio) > N_SAMPLES for audio in audios):
+            return super().transcribe_batch(audios, language, task, prompt)
+        return decoding.transcribe_batch(
+            self.model,
+            audios,
+            bucket_sec=user_settings.audio_context_bucket_sec or CHUNK_LENGTH,
+            padding_sec=settings.AUDIO_CONTEXT_PADDING_SEC,
+            language=language,
+            task=task,
+            prompt=prompt,
+            profile=_decoding_profile(),
+            no_speech_threshold=user_settings.no_speech_gate_threshold,
+            cut_loops=user_settings.loop_cutting_enabled
+        )
+
+    def _detect_language(self, audio: torch.Tensor) -> dict:
+        """
+        Detects language of an audio like Whisper's transcribe() does,
+        but also returns probability of the language.
+        """
+        start = time.perf_counter()
+        mel = log_mel_spectrogram(pad_or_trim(audio), self.model.dims.n_mels)
+        _, probabilities = self.model.detect_language(mel)
+        language = max(probabilities, key=probabilities.get)
+        return {
+            "language": language,
+            "language_probability": probabilities[language],
+            "language_detection_sec": time.perf_counter() - start,
+        }
+
+
+class FasterWhisperBackend(InferenceBackend):
+    """
+    CTranslate2 implementation with int8 quantized weights
+    (requires the "faster-whisper" package).
+    Its models are downloaded from Hugging Face Hub.
+    """
+    def download(self, qt_thread: InitializationThread, name: str) -> str:
+        faster_whisper = self._import()
+        self.model_name = name
+        qt_thread.sendMessage(f'Downloading "{name}" model...', 0, 100)
+        return faster_whisper.download_model(
+            name,
+            cache_dir=str(settings.WORK_DIR / "faster-whisper")
+        )
+
+    def load(self, model_path: str, progress: ProgressReporter = None):
+        faster_whisper = self._import()
+        if progress is not None:
+            progress.stage("Loading the model...")
+        self.model = faster_whisper.WhisperModel(
+            model_path,
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=num_threads() or 0
+        )
+
+    def transcribe(
+            self,
+            audio: np.ndarray,
+            language: str = None,
+            task: str = "transcribe",
+            prompt: str = None
+    ) -> dict:
+        profile = _decoding_profile()
+        segments, info = self.model.transcribe(
+            audio,
+            language=language,
+            task=task,
+            initial_prompt=prompt,
+            temperature=list(profile.temperatures),
+            condition_on_previous_text=profile.condition_on_previous_text,
+            beam_size=profile.beam_size or 1,
+            best_of=profile.best_of or 1,
+            max_new_tokens=profile.sample_len
+        )
+        segments = list(segments)
+        result = {
+            "text": "".join(segment.text for segment in segments),
+            "language": info.language,
+            "avg_logprob": _mean([
+                segment.avg_logprob for segment in segments
+            ]),
+            "retries": sum(
+                profile.temperatures.index(segment.temperature)
+                for segment in segments
+            ),
+        }
+        if language is None:
+            result["language_probability"] = info.language_probability
+        return result
+
+    @staticmethod
+    def _import():
+        try:
+            import faster_whisper
+        except ImportError:
+            raise EnvironmentError(
+                'Please install the "faster-whisper" package '
+                'to use the faster-whisper inference backend.'
+            )
+        return faster_whisper
+
+
+def _decoding_profile() -> decoding.DecodingProfile:
+    return decoding.DECODING_PROFILES[user_settings.decoding_profile]
+
+
+def _mean(values: list[float]) -> float | None:
+    return sum(values) / len(values) if values else None
+
+
+INFERENCE_BACKENDS: dict[str, type[InferenceBackend]] = {
+    "whisper": WhisperBackend,
+    "faster-whisper": FasterWhisperBackend,
+}
@@ -1,15 +1,23 @@
 from __future__ import annotations
+import gc
+import time
 from typing import TYPE_CHECKING
-from io import BytesIO
 
-import whisper
 import numpy as np
 import sounddevice as sd
-import torch
-from scipy.io.wavfile import write
-from ffmpeg import FFmpeg
 
 from live_whisper_gui.settings import user_settings, settings
+from live_whisper_gui.live_whisper.buffer import AudioBuffer
+from live_whisper_gui.live_whisper.resampling import resample
+from live_whisper_gui.live_whisper.segments import SegmentQueue
+from live_whisper_gui.live_whisper.vad import create_vad
+from live_whisper_gui.live_whisper.devices import reinitialize_if_unknown
+from live_whisper_gui.live_whisper.streaming import LocalAgreement
+from live_whisper_gui.live_whisper.context import TranscriptContext
+from live_whisper_gui.live_whisper.language import LanguageLock
+from live_whisper_gui.live_whisper.backends import InferenceBackend
+from live_whisper_gui.live_whisper.parallelism import pinned
+from live_whisper_gui.live_whisper.progress import ProgressReporter
 
 
 # Created by Nik Stromberg - nikorasu85@gmail.com - MIT 2022 - copilot
@@ -30,30 +38,167 @@ class LiveWhisper:
     ----------
     _qt_thread: QtCore.QThread
         Associated thread to communicate with the GUI.
+    backend: InferenceBackend
+        Engine running the loaded Whisper model.
+    input_device: str
+        Name of the input device being listened to.
+    sample_rate: int
+        Sample rate the input device is listened with.
     """
     _qt_thread: LiveWhisperThread = None
+    backend: InferenceBackend = None
+    input_device: str = None
+    sample_rate: int = settings.SAMPLE_RATE
+    _input_device_changed: bool = False
 
     @classmethod
-    def init(cls, model_path: str):
+    def init(
+            cls,
+            backend: InferenceBackend,
+            model_path: str,
+            progress: ProgressReporter = None
+    ):
         """
         Prepares all variables for listening and loads a Whisper model to RAM.
 
         Parameters
         ----------
+        backend: InferenceBackend
+            Engine to run the model with.
         model_path: str
             Local path to a downloaded whisper model.
+        progress: ProgressReporter
+            Reporter of loading stages.
         """
-        cls.padding = 0
-        cls.is_buffer_ready = False
-        cls.buffer = np.zeros((0, 1))
-        cls.prev_block = cls.buffer.copy()
-        cls.ready_buffer = BytesIO()
         cls.running = False
-        if hasattr(cls, 'model'):
-            del cls.model
-        cls.model = whisper.load_model(model_path)
+        cls.reset()
+        cls.backend = None
+        backend.load(model_path, progress)
+        cls.backend = backend
         cls.running = True
 
+    @classmethod
+    def swap_backend(
+            cls,
+            backend: InferenceBackend,
+            model_path: str,
+            progress: ProgressReporter = None
+    ):
+        """
+        Loads a model to a new backend while the current one keeps
+        transcribing, then switches to the new backend. The previous
+        backend is closed and memory of its model is released after
+        its current transcription.
+
+        Parameters
+        ----------
+        backend: InferenceBackend
+            Engine to run the new model with.
+        model_path: str
+            Local path to a downloaded whisper model.
+        progress: ProgressReporter
+            Reporter of loading stages.
+        """
+        try:
+            backend.load(model_path, progress)
+        except Exception:
+            backend.close()
+            raise
+        previous_backend, cls.backend = cls.backend, backend
+        if previous_backend is not None:
+            previous_backend.close()
+        del previous_backend
+        gc.collect()
+
+    @classmethod
+    def switch_input_device(cls, input_device: str):
+        """
+        Makes listening continue with another input device. Only the input
+        stream is reopened; the model and pending segments are kept.
+
+        Parameters
+        ----------
+        input_device: str
+            Name of an input device to listen to.
+        """
+        cls.input_device = input_device
+        cls._input_device_changed = True
+        cls.segments.wake()
+
+    @classmethod
+    def redetect_language(cls):
+        """
+        Makes the language of the speech be detected again
+        on the next segments.
+        """
+        cls.language_lock.unlock()
+
+    @classmethod
+    def reset(cls):
+        """
+        Prepares all variables used while listening.
+        Collected but not transcribed audio is dropped
+        and the context of the transcription is forgotten.
+        """
+        cls._reset_capture()
+        cls.context = TranscriptContext(
+            max_words=settings.PROMPT_CONTEXT_WORDS,
+            glossary=user_settings.glossary,
+            carry_over=user_settings.prompt_context_enabled
+        )
+        cls.decoding_stats = {}
+        cls.segments_without_speech = 0
+        cls.loops_cut = 0
+        cls.language_lock = LanguageLock(
+            confirmations=settings.LANGUAGE_LOCK_CONFIRMATIONS,
+            min_probability=settings.LANGUAGE_LOCK_MIN_PROBABILITY,
+            min_avg_logprob=settings.LANGUAGE_UNLOCK_MIN_AVG_LOGPROB,
+            max_unconfident=settings.LANGUAGE_UNLOCK_SEGMENTS
+        )
+        cls.segments = SegmentQueue(
+            maxsize=settings.SEGMENT_QUEUE_SIZE,
+            policy=user_settings.segment_queue_policy,
+            max_segment_length=int(
+                cls.sample_rate * settings.MAX_MERGED_SEGMENT_SEC
+            )
+        )
+
+    @classmethod
+    def _reset_capture(cls):
+        """
+        Prepares variables used to collect audio of an input device.
+        Segments waiting to be transcribed are kept.
+        """
+        cls.padding = 0
+        cls.block_size = int(
+            cls.sample_rate * settings.BLOCK_SIZE_MSEC / 1000
+        )
+        cls.min_buffer_length = int(
+            cls.sample_rate * settings.MIN_TRANSCRIBE_BUFFER_SEC
+        )
+        cls.max_buffer_length = int(
+            cls.sample_rate * settings.MAX_TRANSCRIBE_BUFFER_SEC
+        )
+        cls.buffer = AudioBuffer(
+            capacity=cls.max_buffer_length + cls.block_size,
+            block_size=cls.block_size
+        )
+        cls.vad = create_vad(
+            backend=user_settings.vad_backend,
+            sample_rate=cls.sample_rate,
+            block_size=cls.block_size
+        )
+        # The audio callback's detector may keep state between blocks,
+        # so segments are checked with a separate one.
+        cls.segment_vad = create_vad(
+            backend=user_settings.vad_backend,
+            sample_rate=cls.sample_rate,
+            block_size=cls.block_size
+        )
+        cls.agreement = LocalAgreement(settings.STREAMING_AGREEMENT)
+        cls.partial_generation = None
+        cls.partial_length = 0
+
     @classmethod
     def listen(
             cls,
@@ -71,23 +216,88 @@ class LiveWhisper:
         input_device: str
             Name of an input device to listen to.
         """
-        if not cls.model:
+        if not cls.backend:
             raise EnvironmentError(
                 "Please use LiveWhisper.init() method "
                 "before starting the listening."
             )
         cls._qt_thread = qt_thread
+        cls.input_device = input_device
+        reinitialize_if_unknown(input_device)
+        cls.sample_rate = cls._negotiate_sample_rate(input_device)
+        cls.reset()
+        while cls.running:
+            cls._listen_input_device()
+
+    @classmethod
+    def _listen_input_device(cls):
+        """
+        Listens to the current input device until the listening is stopped
+        or the device is switched. When the new device needs another
+        sample rate, segments recorded with the old one are transcribed
+        before reopening the stream.
+        """
+        cls._input_device_changed = False
+        # The stream is started before the thread is pinned to the worker
+        # CPUs, so its audio callback thread doesn't inherit them.
         with sd.InputStream(
-                device=input_device,
+                device=cls.input_device,
                 channels=1,
                 callback=cls._callback,
-                blocksize=int(
-                    settings.SAMPLE_RATE * settings.BLOCK_SIZE_MSEC / 1000
-                ),
-                samplerate=settings.SAMPLE_RATE
-        ):
-            while cls.running:
+                blocksize=cls.block_size,
+                samplerate=cls.sample_rate
+        ), pinned():
+            while cls.running and not cls._input_device_changed:
                 cls._process()
+        if not cls.running:
+            return
+        reinitialize_if_unknown(cls.input_device)
+        sample_rate = cls._negotiate_sample_rate(cls.input_device)
+        if sample_rate != cls.sample_rate:
+            with pinned():
+                while segments := cls.segments.get_batch(
+                        settings.TRANSCRIBE_BATCH_SIZE,
+                        timeout=0
+                ):
+                    cls._process_segments(segments)
+            cls.sample_rate = sample_rate
+            cls.segments.max_segment_length = int(
+                sample_rate * settings.MAX_MERGED_SEGMENT_SEC
+            )
+        cls._reset_capture()
+
+    @classmethod
+    def stop(cls):
+        """
+        Stops listening. A segment being transcribed at the moment
+        is finished first.
+        """
+        cls.running = False
+        cls.segments.close()
+
+    @staticmethod
+    def _negotiate_sample_rate(input_device: str = None) -> int:
+        """
+        Chooses a sample rate to listen to an input device with.
+        Whisper's sample rate is preferred, so no resampling is needed.
+        Otherwise, the device's default sample rate is used.
+
+        Parameters
+        ----------
+        input_device: str
+            Name of an input device to listen to.
+        """
+        try:
+            sd.check_input_settings(
+                device=input_device,
+                channels=1,
+                dtype='float32',
+                samplerate=settings.SAMPLE_RATE
+            )
+        except (sd.PortAudioError, ValueError):
+            device_info = sd.query_devices(input_device, 'input')
+            return int(device_info['default_samplerate'])
+        return settings.SAMPLE_RATE
 
     @classmethod
     def _callback(cls, indata, frames, time, status):
@@ -96,85 +306,247 @@ class LiveWhisper:
         """
         if not indata.any():
             return
-        if len(cls.buffer) > settings.MAX_TRANSCRIBE_BUFFER_LENGTH:
+        if len(cls.buffer) > cls.max_buffer_length:
             return cls._save_audio()
-        freq = (
-            np.argmax(np.abs(np.fft.rfft(indata[:, 0])))
-            * settings.SAMPLE_RATE / frames
-        )
-        if (
-            indata.max() > user_settings.input_device_sensitivity
-            and settings.VOCAL_RANGE[0] <= freq <= settings.VOCAL_RANGE[1]
-        ):
+        if cls.vad.is_speech(indata):
             cls._qt_thread.sendMessage('.')
-            if cls.padding < 1:
-                cls.buffer = cls.prev_block.copy()
-            cls.buffer = np.concatenate((cls.buffer, indata))
+            if cls.padding < 1 and len(cls.buffer) <= cls.min_buffer_length:
+                cls.buffer.start()
+            cls.buffer.append(indata)
             cls.padding = settings.SILENT_BLOCKS_TO_SAVE
         else:
             cls.padding -= 1
             if cls.padding > 1:
-                cls.buffer = np.concatenate((cls.buffer, indata))
-            elif cls.buffer.shape[0] > settings.SAMPLE_RATE:
+                cls.buffer.append(indata)
+            elif len(cls.buffer) > cls.min_buffer_length:
                 cls._save_audio()
             else:
-                cls.prev_block = indata.copy()
+                cls.buffer.keep_preroll(indata)
 
     @classmethod
     def _process(cls):
         """
         Processes prepared data by sending it to Whisper.
+        Blocks until a segment is ready or the listening is stopped.
+        Segments pending together are transcribed as one batch.
+        In the streaming mode, an utterance being collected is decoded
+        while no segments are coming.
         """
-        if cls.is_buffer_ready:
-            audio = cls._load_audio()
-            result = cls.model.transcribe(
-                audio=audio,
-                fp16=False,
-                language='en' if 'en' in user_settings.whisper_model else '',
-                task=(
-                    'translate'
-                    if user_settings.translation_enabled else
-                    'transcribe'
-                )
-            )
+        segments = cls.segments.get_batch(
+            settings.TRANSCRIBE_BATCH_SIZE,
+            timeout=(
+                settings.STREAMING_STEP_MSEC / 1000
+                if user_settings.streaming_enabled else
+                None
+            ),
+            wait=settings.TRANSCRIBE_BATCH_WAIT_MSEC / 1000
+        )
+        if (
+            not segments
+            and user_settings.streaming_enabled
+            and cls.running
+            and not cls._input_device_changed
+        ):
+            return cls._process_partial()
+        if segments:
+            cls._process_segments(segments)
+
+    @classmethod
+    def _process_segments(cls, segments: list[np.ndarray]):
+        """
+        Transcribes collected segments and sends their texts to the GUI
+        in order. Words repeating the end of the previous segment
+        are removed. Segments with too little speech are dropped
+        without decoding them.
+
+        Parameters
+        ----------
+        segments: list[np.ndarray]
+            Audios recorded with the input device's sample rate.
+        """
+        if user_settings.min_segment_speech_ratio:
+            speech = [
+                segment for segment in segments
+                if cls.segment_vad.speech_ratio(segment)
+                >= user_settings.min_segment_speech_ratio
+            ]
+            cls.segments_without_speech += len(segments) - len(speech)
+            segments = speech
+            if not segments:
+                return
+        audios = [cls._load_audio(segment) for segment in segments]
+        profile = user_settings.decoding_profile
+        start = time.perf_counter()
+        results = cls._transcribe_batch(audios)
+        cls._count_decoding(profile, results, time.perf_counter() - start)
+        cls.agreement.reset()
+        for result in results:
+            if result.get('skipped'):
+                cls.segments_without_speech += 1
+            if result.get('looped'):
+                cls.loops_cut += 1
+            text = cls.context.add(result['text'])
+            stats = {
+                **cls.segments.stats(),
+                "segments_without_speech": cls.segments_without_speech,
+                "decoding_loops_cut": cls.loops_cut,
+                **cls._decoding_stats()
+            }
+            if cls._forced_language(cls.backend) is None:
+                cls.language_lock.update(result)
+                stats.update(cls.language_lock.stats())
             if cls._qt_thread:
-                cls._qt_thread.sendMessage(result['text'])
-            cls.is_buffer_ready = False
+                cls._qt_thread.sendMessage(text)
+                cls._qt_thread.sendStats(stats)
 
     @classmethod
-    def _save_audio(cls):
+    def _count_decoding(
+            cls,
+            profile: str,
+            results: list[dict],
+            seconds: float
+    ):
         """
-        Saves collected sound data and sends it to
-        _process method by filling the ready_buffer.
+        Adds transcribed segments to statistics of a decoding profile.
         """
-        cls.ready_buffer = BytesIO()
-        write(cls.ready_buffer, settings.SAMPLE_RATE, cls.buffer)
-        cls.buffer = np.zeros((0, 1))
-        cls.is_buffer_ready = True
+        segments, total_sec, retries = cls.decoding_stats.get(
+            profile, (0, 0., 0)
+        )
+        cls.decoding_stats[profile] = (
+            segments + len(results),
+            total_sec + seconds,
+            retries + sum(result.get('retries') or 0 for result in results)
+        )
 
     @classmethod
-    def _load_audio(cls):
+    def _decoding_stats(cls) -> dict:
         """
-        Loads a collected audio from ready_buffer and prepares it
-        for processing by Whisper.
+        Returns decoding time and retries per segment of every profile used.
         """
-        ffmpeg = (
-            FFmpeg()
-            .option("y")
-            .input("pipe:0")
-            .output(
-                "pipe:1",
-                f="s16le",
-                ac="1",
-                acodec="pcm_s16le",
-                ar=str(whisper.audio.SAMPLE_RATE),
+        return {
+            f"decoding_{profile}": (
+                f"{total_sec / segments:.2f} s, "
+                f"{retries / segments:.2f} retries per segment"
             )
+            for profile, (segments, total_sec, retries)
+            in cls.decoding_stats.items()
+        }
+
+    @classmethod
+    def _process_partial(cls):
+        """
+        Decodes an utterance which is still being collected and sends
+        its text to the GUI as a partial message.
+        Words which stayed the same across decodings are committed,
+        so they don't change until the whole segment is transcribed.
+        """
+        generation = cls.buffer.generation
+        length = len(cls.buffer)
+        if (
+            cls.padding < 1
+            or length < settings.STREAMING_MIN_AUDIO_SEC * cls.sample_rate
+            or (
+                generation == cls.partial_generation
+                and length - cls.partial_length
+                < settings.STREAMING_STEP_MSEC / 1000 * cls.sample_rate
+            )
+        ):
+            return
+        audio = cls.buffer.snapshot()[:, 0]
+        if generation != cls.buffer.generation:
+            return
+        if generation != cls.partial_generation:
+            cls.agreement.reset()
+        cls.partial_generation = generation
+        cls.partial_length = length
+        result = cls._transcribe(cls._load_audio(audio))
+        committed, unstable = cls.agreement.update(
+            cls.context.deduplicate(result['text'])
         )
-        out = ffmpeg.execute(cls.ready_buffer)
-        return torch.from_numpy(
-            np.frombuffer(out, np.int16)
-            .flatten()
-            .astype(np.float32)
-            / 32768.0
+        if cls._qt_thread:
+            cls._qt_thread.sendMessage(
+                f"{committed} {unstable}",
+                partial=True
+            )
+
+    @classmethod
+    def _transcribe(cls, audio: np.ndarray) -> dict:
+        """
+        Sends an audio to Whisper, see _transcribe_batch().
+
+        Parameters
+        ----------
+        audio: np.ndarray
+            Audio with Whisper's sample rate.
+        """
+        return cls._transcribe_batch([audio])[0]
+
+    @classmethod
+    def _transcribe_batch(cls, audios: list[np.ndarray]) -> list[dict]:
+        """
+        Sends audios to Whisper, prompting it with the context.
+        The language is detected by Whisper only until it's locked.
+
+        Parameters
+        ----------
+        audios: list[np.ndarray]
+            Audios with Whisper's sample rate.
+        """
+        backend = cls.backend
+        return backend.transcribe_batch(
+            audios=audios,
+            language=(
+                cls._forced_language(backend) or cls.language_lock.language
+            ),
+            task=(
+                'translate'
+                if user_settings.translation_enabled else
+                'transcribe'
+            ),
+            prompt=cls.context.prompt()
         )
 
+    @staticmethod
+    def _forced_language(backend: InferenceBackend) -> str | None:
+        """
+        Returns the language chosen by the user or the only language
+        of the model. None if the language must be detected.
+        """
+        if user_settings.language:
+            return user_settings.language
+        if 'en' in backend.model_name:
+            return 'en'
+        return None
+
+    @classmethod
+    def _save_audio(cls):
+        """
+        Saves collected sound data and sends it to
+        _process method through the segments queue.
+        If the queue applies backpressure, the data is kept
+        and collecting continues until the buffer is full.
+        """
+        if cls.segments.accepts_new:
+            cls.segments.put(cls.buffer.snapshot()[:, 0])
+        elif len(cls.buffer) > cls.max_buffer_length:
+            cls.segments.drop()
+        else:
+            return
+        cls.buffer.clear()
+
+    @classmethod
+    def _load_audio(cls, segment: np.ndarray):
+        """
+        Prepares a collected audio segment for processing by Whisper.
+
+        Parameters
+        ----------
+        segment: np.ndarray
+            Audio recorded with the input device's sample rate.
+        """
+        return resample(
+            segment,
+            from_rate=cls.sample_rate,
+            to_rate=settings.SAMPLE_RATE,
+            resampler=user_settings.resampler
+        )
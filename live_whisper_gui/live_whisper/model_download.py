@@ -1,13 +1,14 @@
 from __future__ import annotations
 import os
-import hashlib
+import json
 import warnings
-import urllib
 from typing import TYPE_CHECKING
 
 from whisper import _MODELS
 
 from live_whisper_gui.settings import settings
+from live_whisper_gui.live_whisper.downloading import download, file_sha256
+from live_whisper_gui.live_whisper.progress import ProgressReporter
 
 
 if TYPE_CHECKING:
@@ -32,15 +33,21 @@ def model_download(qt_thread: InitializationThread, name: str) -> str:
     expected_sha256 = url.split("/")[-2]
     download_target = os.path.join(settings.WORK_DIR, os.path.basename(url))
 
+    progress = ProgressReporter(qt_thread.sendMessage)
     if os.path.exists(download_target) and not os.path.isfile(download_target):
         raise RuntimeError(
             f"{download_target} exists and is not a regular file"
         )
 
     if os.path.isfile(download_target):
-        with open(download_target, "rb") as f:
-            model_bytes = f.read()
-        if hashlib.sha256(model_bytes).hexdigest() == expected_sha256:
+        if (
+            not settings.VERIFY_MODEL
+            and is_verified(download_target, expected_sha256)
+        ):
+            return download_target
+        progress.stage(f'Verifying "{name}" Whisper model...', in_bytes=True)
+        if file_sha256(download_target, progress.update) == expected_sha256:
+            save_verification(download_target, expected_sha256)
             return download_target
         else:
             warnings.warn(
@@ -48,30 +55,62 @@ def model_download(qt_thread: InitializationThread, name: str) -> str:
                 f"does not match; re-downloading the file"
             )
 
-    with (
-        urllib.request.urlopen(url) as source,
-        open(download_target, "wb") as output
-    ):
-        total = int(source.info().get("Content-Length"))
-        downloaded = 0
-        while True:
-            buffer = source.read(8192)
-            if not buffer:
-                break
-
-            output.write(buffer)
-            downloaded += len(buffer)
-            qt_thread.sendMessage(
-                f'Downloading "{name}" Whisper model...',
-                downloaded,
-                total
-            )
-
-    model_bytes = open(download_target, "rb").read()
-    if hashlib.sha256(model_bytes).hexdigest() != expected_sha256:
+    progress.stage(f'Downloading "{name}" Whisper model...', in_bytes=True)
+    downloaded = download(
+        url=url,
+        target=download_target,
+        expected_sha256=expected_sha256,
+        on_progress=progress.update,
+        connections=settings.DOWNLOAD_CONNECTIONS,
+        retries=settings.DOWNLOAD_RETRIES,
+        timeout=settings.DOWNLOAD_TIMEOUT_SEC
+    )
+    if not downloaded:
         raise RuntimeError(
             "Model has been downloaded but the SHA256 checksum "
             "does not not match. Please retry loading the model."
         )
+    save_verification(download_target, expected_sha256)
 
     return download_target
+
+
+def is_verified(path: str, expected_sha256: str) -> bool:
+    """
+    Checks if a file has already been verified against the checksum
+    and has not changed since then.
+    """
+    try:
+        with open(verification_path(path)) as file:
+            record = json.load(file)
+    except (OSError, json.decoder.JSONDecodeError):
+        return False
+    return record == _verification_record(path, expected_sha256)
+
+
+def save_verification(path: str, sha256: str):
+    """
+    Remembers that a file matches the checksum, so it won't be hashed again
+    until it changes.
+    """
+    with open(verification_path(path), "w") as file:
+        json.dump(_verification_record(path, sha256), file)
+
+
+def verification_path(path: str) -> str:
+    """
+    Returns a path of the verification record of a file.
+    """
+    return os.path.join(
+        settings.WORK_DIR, f"{os.path.basename(path)}.verified.json"
+    )
+
+
+def _verification_record(path: str, sha256: str) -> dict:
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "inode": stat.st_ino,
+        "sha256": sha256,
+    }
@@ -0,0 +1,78 @@
+from typing import Callable
+
+import torch
+from torch.overrides import TorchFunctionMode
+from whisper.model import ModelDimensions, Whisper
+
+
+def load_model(
+        model_path: str,
+        on_progress: Callable[[int, int], None] = None
+) -> Whisper:
+    """
+    Loads a Whisper model from a checkpoint to CPU. The checkpoint is
+    memory-mapped and its tensors are assigned to an empty model
+    one by one, so the whole file is never copied to RAM in addition
+    to the model's weights. float16 weights of published checkpoints
+    are converted to float32 on the way.
+
+    Parameters
+    ----------
+    model_path: str
+        Local path to a downloaded whisper model.
+    on_progress: Callable[[int, int], None]
+        Function called with number of loaded and total tensors.
+    """
+    on_progress = on_progress or (lambda done, total: None)
+    checkpoint = load_checkpoint(model_path)
+    model = empty_model(ModelDimensions(**checkpoint["dims"]))
+    state_dict = checkpoint.pop("model_state_dict")
+    for index, name in enumerate(state_dict):
+        if state_dict[name].is_floating_point():
+            state_dict[name] = state_dict[name].float()
+        on_progress(index + 1, len(state_dict))
+    model.load_state_dict(state_dict, assign=True)
+    return model
+
+
+def load_checkpoint(path: str) -> dict:
+    """
+    Loads a checkpoint saved by torch.save() with memory mapping,
+    so tensors are read from disk only when they are accessed.
+    Checkpoints in the legacy format, which can't be mapped,
+    are read to RAM.
+    """
+    try:
+        return torch.load(
+            path, map_location="cpu", mmap=True, weights_only=True
+        )
+    except RuntimeError:
+        return torch.load(path, map_location="cpu", weights_only=True)
+
+
+def empty_model(dims: ModelDimensions) -> Whisper:
+    """
+    Creates a Whisper model without initializing its weights. Memory of
+    the weights is allocated but never touched, so it doesn't take RAM
+    until it's replaced by load_state_dict(..., assign=True).
+
+    Parameters
+    ----------
+    dims: ModelDimensions
+        Dimensions of the model.
+    """
+    with _SkipInitialization():
+        return Whisper(dims)
+
+
+class _SkipInitialization(TorchFunctionMode):
+    """
+    Turns random initializers of weights used by PyTorch modules into no-op.
+    """
+    initializers = {"kaiming_uniform_", "uniform_", "normal_"}
+
+    def __torch_function__(self, func, types, args=(), kwargs=None):
+        kwargs = kwargs or {}
+        if getattr(func, "__name__", None) in self.initializers:
+            return args[0] if args else kwargs["tensor"]
+        return func(*args, **kwargs)
@@ -0,0 +1,110 @@
+import os
+import warnings
+from contextlib import contextmanager
+
+from live_whisper_gui.settings import settings, user_settings
+
+
+def num_threads() -> int | None:
+    """
+    Returns number of threads used inside one inference operation.
+    Command line and environment overrides take precedence over
+    user settings. None means the engine's default.
+    """
+    return settings.TORCH_NUM_THREADS or user_settings.torch_num_threads
+
+
+def num_interop_threads() -> int | None:
+    """
+    Returns number of threads used to run independent operations
+    in parallel. None means the engine's default.
+    """
+    return (
+        settings.TORCH_INTEROP_THREADS
+        or user_settings.torch_interop_threads
+    )
+
+
+def cpu_affinity() -> str | None:
+    """
+    Returns a list of CPUs the transcription worker is pinned to,
+    like "0-3,8". None means any CPU.
+    """
+    return (
+        settings.WORKER_CPU_AFFINITY
+        or user_settings.worker_cpu_affinity
+    )
+
+
+def worker_cpus() -> set[int] | None:
+    """
+    Returns CPUs the transcription worker is pinned to.
+    None means any CPU.
+    """
+    cpu_list = cpu_affinity()
+    if not cpu_list:
+        return None
+    return parse_cpu_list(cpu_list)
+
+
+def parse_cpu_list(cpu_list: str) -> set[int]:
+    """
+    Parses a list of CPUs like "0-3,8,10-11".
+    """
+    cpus = set()
+    for part in cpu_list.split(","):
+        first, _, last = part.strip().partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def configure_torch_threads():
+    """
+    Applies thread counts to PyTorch. Number of inter-op threads can be set
+    only once, before any parallel work is started.
+    """
+    import torch
+
+    if num_threads():
+        torch.set_num_threads(num_threads())
+    if (
+        num_interop_threads()
+        and num_interop_threads() != torch.get_num_interop_threads()
+    ):
+        try:
+            torch.set_num_interop_threads(num_interop_threads())
+        except RuntimeError as error:
+            warnings.warn(f"Can't set number of inter-op threads: {error}")
+
+
+def pin_current_thread():
+    """
+    Pins the calling thread to the worker CPUs, if they are set.
+    On Linux, threads it starts afterwards are pinned to them as well,
+    so threads which mustn't compete with the worker (like the audio
+    callback thread) must be started before, see pinned().
+    """
+    cpus = worker_cpus()
+    if not cpus:
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        warnings.warn("CPU affinity is not supported on this platform")
+        return
+    os.sched_setaffinity(0, cpus)
+
+
+@contextmanager
+def pinned():
+    """
+    Pins the calling thread to the worker CPUs while in the context,
+    and lets it run on its previous CPUs after.
+    """
+    previous = (
+        os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
+    )
+    pin_current_thread()
+    try:
+        yield
+    finally:
+        if previous is not None:
+            os.sched_setaffinity(0, previous)
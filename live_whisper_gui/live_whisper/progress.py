@@ -0,0 +1,121 @@
+import time
+from typing import Callable
+
+from live_whisper_gui.settings import settings
+
+
+class ProgressReporter:
+    """
+    Turns progress of long operations into messages for the GUI.
+    Updates are coalesced: a message is sent at most once
+    per settings.PROGRESS_INTERVAL_SEC and only if it has changed.
+    Work is split into stages, each taking its part of the progress bar.
+    """
+    def __init__(self, send: Callable[[str, int, int], None] = None):
+        """
+        Parameters
+        ----------
+        send: Callable[[str, int, int], None]
+            Function receiving a message, progress in percent and 100,
+            like InitializationThread.sendMessage.
+            Nothing is sent if it's None.
+        """
+        self._send = send
+        self._name = ""
+        self._start = 0.0
+        self._end = 1.0
+        self._in_bytes = False
+        self._started_at = None
+        self._done_at_start = 0
+        self._sent_at = 0.0
+        self._sent = None
+
+    def stage(
+            self,
+            name: str,
+            start: float = 0.0,
+            end: float = 1.0,
+            in_bytes: bool = False
+    ):
+        """
+        Starts a new stage and reports it immediately.
+
+        Parameters
+        ----------
+        name: str
+            Message describing the stage.
+        start: float
+            Part of the work done when the stage starts, from 0 to 1.
+        end: float
+            Part of the work done when the stage ends, from 0 to 1.
+        in_bytes: bool
+            True if the stage processes bytes, so its throughput is reported.
+        """
+        self._name = name
+        self._start = start
+        self._end = end
+        self._in_bytes = in_bytes
+        self._started_at = None
+        self._emit(name, 0.0)
+
+    def update(self, done: int, total: int):
+        """
+        Reports progress of the current stage. Throughput and time left
+        are measured from the first update, so work done before
+        (like a resumed download) doesn't count.
+
+        Parameters
+        ----------
+        done: int
+            How much work of the stage is done.
+        total: int
+            How much work the stage has.
+        """
+        now = time.monotonic()
+        if self._started_at is None:
+            self._started_at = now
+            self._done_at_start = done
+        finished = done >= total
+        if (
+            not finished
+            and now - self._sent_at < settings.PROGRESS_INTERVAL_SEC
+        ):
+            return
+        message = self._name
+        elapsed = max(now - self._started_at, 1e-9)
+        speed = (done - self._done_at_start) / elapsed
+        if not finished and speed > 0:
+            details = [f"{_format_duration((total - done) / speed)} left"]
+            if self._in_bytes:
+                details.insert(0, f"{speed / 1024 / 1024:.1f} MB/s")
+            message = f"{message}\n{', '.join(details)}"
+        self._emit(message, done / total if total else 1.0)
+
+    def forward(self, message: str, progress: int, total: int):
+        """
+        Sends a message of another reporter as is,
+        like one received from the model daemon.
+        """
+        self._sent = message, progress * 100 // total
+        self._sent_at = time.monotonic()
+        if self._send is not None:
+            self._send(message, progress, total)
+
+    def _emit(self, message: str, fraction: float):
+        percent = int(
+            100 * (self._start + (self._end - self._start) * fraction)
+        )
+        if (message, percent) == self._sent:
+            return
+        self._sent = message, percent
+        self._sent_at = time.monotonic()
+        if self._send is not None:
+            self._send(message, percent, 100)
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+    return f"{minutes}:{seconds:02}"
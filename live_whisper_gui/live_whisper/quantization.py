@@ -0,0 +1,117 @@
+import os
+import warnings
+from pathlib import Path
+
+import torch
+import whisper
+from torch import nn
+from torch.ao.nn.quantized import dynamic as nnqd
+from whisper.model import ModelDimensions, Whisper
+
+from live_whisper_gui.settings import settings
+from live_whisper_gui.live_whisper.model_loading import (
+    empty_model,
+    load_checkpoint,
+    load_model
+)
+from live_whisper_gui.live_whisper.progress import ProgressReporter
+
+
+def quantize(model: Whisper) -> Whisper:
+    """
+    Replaces Linear layers of a model with dynamically quantized int8 ones.
+    The model is changed in place.
+
+    Parameters
+    ----------
+    model: Whisper
+        Loaded float32 model.
+    """
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            # Whisper's Linear only casts weights to the input's dtype,
+            # which is useless for quantized layers, and quantize_dynamic
+            # accepts exact nn.Linear only.
+            module.__class__ = nn.Linear
+    return torch.ao.quantization.quantize_dynamic(
+        model, {nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+def load_quantized(
+        model_path: str,
+        progress: ProgressReporter = None
+) -> Whisper:
+    """
+    Loads a model with int8 Linear layers. The quantized model is cached
+    in the work dir, so the quantization is done only once per model file.
+
+    Parameters
+    ----------
+    model_path: str
+        Local path to a downloaded whisper model.
+    progress: ProgressReporter
+        Reporter of loading stages.
+    """
+    progress = progress or ProgressReporter()
+    cache_path = quantized_cache_path(model_path)
+    source = _source_signature(model_path)
+    if cache_path.exists():
+        try:
+            progress.stage("Loading the quantized model...")
+            checkpoint = load_checkpoint(cache_path)
+            if checkpoint["source"] == source:
+                return _from_checkpoint(checkpoint)
+        except Exception as error:
+            warnings.warn(
+                f"Can't load the quantized model from {cache_path} "
+                f"({error}); quantizing the model again"
+            )
+    progress.stage("Loading the model...", 0.0, 0.6)
+    model = load_model(model_path, progress.update)
+    progress.stage("Quantizing the model...", 0.6, 0.9)
+    quantize(model)
+    progress.stage("Saving the quantized model...", 0.9, 1.0)
+    temp_path = cache_path.with_suffix(".tmp")
+    torch.save(
+        {
+            "source": source,
+            "dims": model.dims.__dict__,
+            "model_state_dict": model.state_dict(),
+        },
+        temp_path
+    )
+    os.replace(temp_path, cache_path)
+    return model
+
+
+def quantized_cache_path(model_path: str) -> Path:
+    """
+    Returns a path the quantized version of a model is cached at.
+    """
+    return settings.WORK_DIR / f"{Path(model_path).stem}.int8.pt"
+
+
+def _source_signature(model_path: str) -> list:
+    stat = os.stat(model_path)
+    return [os.path.basename(model_path), stat.st_size, stat.st_mtime_ns]
+
+
+def _from_checkpoint(checkpoint: dict) -> Whisper:
+    model = empty_model(ModelDimensions(**checkpoint["dims"]))
+    _replace_linear_layers(model)
+    model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+    return model
+
+
+def _replace_linear_layers(module: nn.Module):
+    for name, child in module.named_children():
+        if isinstance(child, nn.Linear):
+            setattr(module, name, nnqd.Linear(
+                child.in_features,
+                child.out_features,
+                bias_=child.bias is not None,
+                dtype=torch.qint8
+            ))
+        else:
+            _replace_linear_layers(child)
@@ -0,0 +1,272 @@
+"""
+Client side of the model daemon: the protocol and an inference backend
+sending audio to the daemon. It doesn't import torch or whisper,
+so a client attaches to a running daemon in moments.
+"""
+from __future__ import annotations
+import json
+import os
+import socket
+import struct
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from live_whisper_gui.settings import (
+    settings,
+    user_settings,
+    InferenceBackendName
+)
+from live_whisper_gui.live_whisper.backends import InferenceBackend
+from live_whisper_gui.live_whisper.progress import ProgressReporter
+from live_whisper_gui.live_whisper.subprocesses import (
+    module_command,
+    module_environment
+)
+from live_whisper_gui.live_whisper.parallelism import (
+    cpu_affinity,
+    num_interop_threads,
+    num_threads
+)
+
+
+if TYPE_CHECKING:
+    from live_whisper_gui.gui.threads import InitializationThread
+
+
+HEADER_SIZE = struct.Struct("!I")
+
+
+def send_message(
+        connection: socket.socket,
+        message: dict,
+        payload: bytes = b""
+):
+    """
+    Sends a JSON message followed by raw bytes.
+    """
+    header = json.dumps({**message, "payload_size": len(payload)}).encode()
+    connection.sendall(HEADER_SIZE.pack(len(header)) + header + payload)
+
+
+def receive_message(connection: socket.socket) -> tuple[dict, bytes]:
+    """
+    Receives a message sent by send_message().
+    Raises ConnectionError if the other side has disconnected.
+    """
+    size, = HEADER_SIZE.unpack(_receive_exactly(connection, HEADER_SIZE.size))
+    message = json.loads(_receive_exactly(connection, size))
+    payload = _receive_exactly(connection, message.pop("payload_size", 0))
+    return message, payload
+
+
+def request(
+        connection: socket.socket,
+        message: dict,
+        payload: bytes = b"",
+        on_progress: Callable[[str, int, int], None] = None
+):
+    """
+    Sends a command to the daemon and waits for its result.
+    Progress messages sent by the daemon meanwhile are passed
+    to on_progress.
+    """
+    send_message(connection, message, payload)
+    while True:
+        reply, _ = receive_message(connection)
+        if "progress" in reply:
+            if on_progress is not None:
+                on_progress(*reply["progress"])
+            continue
+        if "error" in reply:
+            raise RuntimeError(f"Model daemon failed: {reply['error']}")
+        return reply.get("result")
+
+
+def connect(socket_path: Path = None) -> socket.socket:
+    """
+    Connects to the model daemon, starting it if it's not running yet.
+
+    Parameters
+    ----------
+    socket_path: Path
+        Path of the daemon's socket. settings.MODEL_DAEMON_SOCKET if None.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise EnvironmentError(
+            "Model daemon is not supported on this platform"
+        )
+    socket_path = socket_path or settings.MODEL_DAEMON_SOCKET
+    try:
+        return open_socket(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+    log_path = Path(socket_path).with_suffix(".log")
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            module_command(
+                "live_whisper_gui.live_whisper.daemon",
+                "--socket", str(socket_path),
+                "--idle-timeout", str(settings.MODEL_DAEMON_IDLE_TIMEOUT_SEC)
+            ),
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+            env=module_environment()
+        )
+    deadline = time.monotonic() + settings.MODEL_DAEMON_START_TIMEOUT_SEC
+    while True:
+        try:
+            return open_socket(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise EnvironmentError(
+                    f"Model daemon has not started, see {log_path}"
+                )
+            time.sleep(0.05)
+
+
+def open_socket(socket_path: Path) -> socket.socket:
+    """
+    Connects to a Unix socket without starting the daemon.
+    """
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(str(socket_path))
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(min(size - len(data), 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return bytes(data)
+
+
+class RemoteBackend(InferenceBackend):
+    """
+    Client of the model daemon, which keeps the model loaded between
+    launches of the application. The daemon runs another backend
+    and is started on first use. Thread counts and CPU affinity
+    of this process are applied to the daemon with the model.
+    """
+    def __init__(self, backend_name: InferenceBackendName):
+        """
+        Parameters
+        ----------
+        backend_name: InferenceBackendName
+            Name of the backend to run in the daemon.
+        """
+        super().__init__()
+        self.backend_name = backend_name
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def download(self, qt_thread: InitializationThread, name: str) -> str:
+        self.model_name = name
+        return self._request(
+            {
+                "command": "download",
+                "backend": self.backend_name,
+                "model": name,
+            },
+            on_progress=qt_thread.sendMessage
+        )
+
+    def load(self, model_path: str, progress: ProgressReporter = None):
+        progress = progress or ProgressReporter()
+        self._request(
+            {
+                "command": "load",
+                "backend": self.backend_name,
+                "model_name": self.model_name,
+                "model_path": model_path,
+                "quantize_model": user_settings.quantize_model,
+                "num_threads": num_threads(),
+                "num_interop_threads": num_interop_threads(),
+                "cpu_affinity": cpu_affinity(),
+                "pid": os.getpid(),
+            },
+            on_progress=progress.forward
+        )
+        self.model = model_path
+
+    def transcribe(
+            self,
+            audio: np.ndarray,
+            language: str = None,
+            task: str = "transcribe",
+            prompt: str = None
+    ) -> dict:
+        return self.transcribe_batch([audio], language, task, prompt)[0]
+
+    def transcribe_batch(
+            self,
+            audios: list[np.ndarray],
+            language: str = None,
+            task: str = "transcribe",
+            prompt: str = None
+    ) -> list[dict]:
+        return self._request(
+            {
+                "command": "transcribe",
+                "lengths": [len(audio) for audio in audios],
+                "language": language,
+                "task": task,
+                "prompt": prompt,
+                "user_settings": {
+                    key: getattr(user_settings, key)
+                    for key in TRANSCRIPTION_USER_SETTINGS
+                },
+            },
+            payload=np.concatenate(audios).astype(np.float32).tobytes()
+        )
+
+    def close(self):
+        """
+        Disconnects from the daemon after the current request,
+        so it may exit when no other client is attached.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _request(
+            self,
+            message: dict,
+            payload: bytes = b"",
+            on_progress: Callable[[str, int, int], None] = None
+    ):
+        with self._lock:
+            if self._connection is None:
+                self._connection = connect()
+            try:
+                return request(
+                    self._connection, message, payload, on_progress
+                )
+            except OSError:
+                self._connection.close()
+                self._connection = None
+                raise
+
+
+# User settings affecting transcription. They are sent to the model daemon
+# with every segment, so their changes apply without restarting it.
+TRANSCRIPTION_USER_SETTINGS = (
+    "audio_context_bucket_sec",
+    "decoding_profile",
+    "no_speech_gate_threshold",
+    "loop_cutting_enabled",
+)
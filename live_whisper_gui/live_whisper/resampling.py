@@ -0,0 +1,86 @@
+from math import gcd
+from io import BytesIO
+
+import numpy as np
+
+from live_whisper_gui.settings import Resampler
+
+
+def resample(
+        audio: np.ndarray,
+        from_rate: int,
+        to_rate: int,
+        resampler: Resampler = "scipy"
+) -> np.ndarray:
+    """
+    Converts a mono float audio to another sample rate.
+
+    Parameters
+    ----------
+    audio: np.ndarray
+        One-dimensional float audio to convert.
+    from_rate: int
+        Sample rate of the audio.
+    to_rate: int
+        Sample rate to convert the audio to.
+    resampler: Resampler
+        "scipy" to use an in-process polyphase filter,
+        "ffmpeg" to pipe the audio through an ffmpeg process.
+
+    Returns
+    -------
+    np.ndarray
+        One-dimensional float32 audio with the to_rate sample rate.
+    """
+    if from_rate == to_rate:
+        return audio.astype(np.float32, copy=False)
+    if resampler == "ffmpeg":
+        return _resample_ffmpeg(audio, from_rate, to_rate)
+    if resampler != "scipy":
+        raise ValueError(f"There is no resampler called {resampler}")
+    # Imported here, so that clients of the model daemon start without
+    # scipy, and don't import it at all if the input device is listened
+    # with Whisper's sample rate.
+    from scipy.signal import resample_poly
+
+    divisor = gcd(from_rate, to_rate)
+    return resample_poly(
+        audio,
+        up=to_rate // divisor,
+        down=from_rate // divisor
+    ).astype(np.float32, copy=False)
+
+
+def _resample_ffmpeg(
+        audio: np.ndarray,
+        from_rate: int,
+        to_rate: int
+) -> np.ndarray:
+    """
+    Converts an audio by serializing it to WAV and piping it through ffmpeg.
+    Output goes through 16-bit PCM, so precision is lost.
+    """
+    from scipy.io.wavfile import write
+    from ffmpeg import FFmpeg
+
+    wav = BytesIO()
+    write(wav, from_rate, audio)
+    ffmpeg = (
+        FFmpeg()
+        .option("y")
+        .input("pipe:0")
+        .output(
+            "pipe:1",
+            f="s16le",
+            ac="1",
+            acodec="pcm_s16le",
+            ar=str(to_rate),
+        )
+    )
+    out = ffmpeg.execute(wav)
+    return (
+        np.frombuffer(out, np.int16)
+        .flatten()
+        .astype(np.float32)
+        / 32768.0
+    )
@@ -0,0 +1,227 @@
+import time
+from collections import deque
+from threading import Condition
+
+import numpy as np
+
+from live_whisper_gui.settings import SegmentQueuePolicy
+
+
+class SegmentQueue:
+    """
+    Bounded FIFO of audio segments waiting to be transcribed.
+    Filled by the audio callback and emptied by the transcription worker.
+
+    When the queue is full, a new segment is handled according to the policy:
+    "drop_oldest" drops the oldest pending segment,
+    "merge" appends the new segment to the newest pending one
+    (or drops the oldest one if the result would be too long),
+    "backpressure" rejects the new segment, so the caller keeps
+    collecting audio until there is space.
+
+    Attributes
+    ----------
+    enqueued: int
+        Number of segments accepted by the queue.
+    dropped: int
+        Number of segments dropped without being transcribed.
+    merged: int
+        Number of segments merged into a pending one.
+    batched: int
+        Number of segments taken together with others by get_batch().
+    """
+    def __init__(
+            self,
+            maxsize: int,
+            policy: SegmentQueuePolicy = "drop_oldest",
+            max_segment_length: int = None
+    ):
+        """
+        Parameters
+        ----------
+        maxsize: int
+            Maximum number of pending segments.
+        policy: SegmentQueuePolicy
+            What to do with a new segment when the queue is full.
+        max_segment_length: int
+            Maximum number of samples in a merged segment.
+        """
+        self.maxsize = maxsize
+        self.policy = policy
+        self.max_segment_length = max_segment_length
+        self.enqueued = 0
+        self.dropped = 0
+        self.merged = 0
+        self.batched = 0
+        self._segments = deque()
+        self._closed = False
+        self._woken = False
+        self._condition = Condition()
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    @property
+    def accepts_new(self) -> bool:
+        """
+        False if a new segment would be rejected by the backpressure policy.
+        """
+        return (
+            self.policy != "backpressure"
+            or len(self._segments) < self.maxsize
+        )
+
+    def put(self, segment: np.ndarray) -> bool:
+        """
+        Adds a segment to the queue, applying the policy if it's full.
+
+        Parameters
+        ----------
+        segment: np.ndarray
+            Audio segment to transcribe.
+
+        Returns
+        -------
+        bool
+            False if the segment was rejected.
+        """
+        with self._condition:
+            if len(self._segments) >= self.maxsize:
+                if self.policy == "backpressure":
+                    return False
+                if self.policy == "merge" and self._merge(segment):
+                    self.enqueued += 1
+                    self.merged += 1
+                    return True
+                self._segments.popleft()
+                self.dropped += 1
+            self._segments.append(segment)
+            self.enqueued += 1
+            self._condition.notify()
+            return True
+
+    def get(self, timeout: float = None) -> np.ndarray | None:
+        """
+        Waits for a segment and removes it from the queue.
+
+        Parameters
+        ----------
+        timeout: float
+            Maximum number of seconds to wait. Waits forever if None.
+
+        Returns
+        -------
+        np.ndarray | None
+            The oldest pending segment or None if the queue was closed
+            or the timeout expired, or wake() was called.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while (
+                not self._segments
+                and not self._closed
+                and not self._woken
+            ):
+                remaining = (
+                    None if deadline is None else deadline - time.monotonic()
+                )
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            if self._closed:
+                return None
+            if not self._segments:
+                self._woken = False
+                return None
+            return self._segments.popleft()
+
+    def get_batch(
+            self,
+            max_size: int,
+            timeout: float = None,
+            wait: float = 0.
+    ) -> list[np.ndarray]:
+        """
+        Waits for a segment and removes it from the queue together
+        with segments pending after it.
+
+        Parameters
+        ----------
+        max_size: int
+            Maximum number of segments to take.
+        timeout: float
+            Maximum number of seconds to wait for the first segment.
+            Waits forever if None.
+        wait: float
+            Number of seconds to wait for more segments after the first.
+            Only already pending segments are taken if it's 0.
+
+        Returns
+        -------
+        list[np.ndarray]
+            Oldest pending segments. Empty where get() returns None.
+        """
+        segment = self.get(timeout)
+        if segment is None:
+            return []
+        batch = [segment]
+        deadline = time.monotonic() + wait
+        with self._condition:
+            while len(batch) < max_size:
+                if self._segments:
+                    batch.append(self._segments.popleft())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed or self._woken:
+                    break
+                self._condition.wait(remaining)
+            if len(batch) > 1:
+                self.batched += len(batch)
+        return batch
+
+    def drop(self):
+        """
+        Counts a segment the caller had to drop without putting it.
+        """
+        with self._condition:
+            self.dropped += 1
+
+    def wake(self):
+        """
+        Makes a waiting consumer return from get() without a segment,
+        so it can check its state. The queue stays open.
+        """
+        with self._condition:
+            self._woken = True
+            self._condition.notify_all()
+
+    def close(self):
+        """
+        Wakes up all waiting consumers and makes get() return None.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        """
+        Returns counters of the queue.
+        """
+        with self._condition:
+            return {
+                "segments_pending": len(self._segments),
+                "segments_enqueued": self.enqueued,
+                "segments_dropped": self.dropped,
+                "segments_merged": self.merged,
+                "segments_batched": self.batched,
+            }
+
+    def _merge(self, segment: np.ndarray) -> bool:
+        newest = self._segments[-1]
+        if (
+            self.max_segment_length is not None
+            and len(newest) + len(segment) > self.max_segment_length
+        ):
+            return False
+        self._segments[-1] = np.concatenate((newest, segment))
+        return True
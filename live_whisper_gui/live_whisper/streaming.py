@@ -0,0 +1,65 @@
+import re
+
+
+class LocalAgreement:
+    """
+    Local agreement policy for streaming transcription.
+    A growing utterance is decoded again and again; words on which
+    the last hypotheses agree are committed and don't change anymore,
+    the rest of the hypothesis stays unstable.
+
+    Attributes
+    ----------
+    committed: list[str]
+        Words considered stable.
+    """
+    def __init__(self, agreement: int = 2):
+        """
+        Parameters
+        ----------
+        agreement: int
+            Number of consecutive hypotheses which must agree on a word
+            to commit it.
+        """
+        self.agreement = agreement
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets all hypotheses, so a new utterance can be started.
+        """
+        self.committed = []
+        self._hypotheses = []
+
+    def update(self, text: str) -> tuple[str, str]:
+        """
+        Adds a new hypothesis of the whole utterance.
+
+        Parameters
+        ----------
+        text: str
+            Decoded text of the utterance.
+
+        Returns
+        -------
+        tuple[str, str]
+            Committed text and unstable text following it.
+        """
+        words = text.split()
+        self._hypotheses = (self._hypotheses + [words])[-self.agreement:]
+        if len(self._hypotheses) == self.agreement:
+            stable = self._common_prefix_length(self._hypotheses)
+            if stable > len(self.committed):
+                self.committed += words[len(self.committed):stable]
+        unstable = words[len(self.committed):]
+        return " ".join(self.committed), " ".join(unstable)
+
+    @staticmethod
+    def _common_prefix_length(hypotheses: list[list[str]]) -> int:
+        length = 0
+        for words in zip(*hypotheses):
+            normalized = {re.sub(r"\W", "", word).lower() for word in words}
+            if len(normalized) > 1:
+                break
+            length += 1
+        return length
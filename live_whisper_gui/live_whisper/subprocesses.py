@@ -0,0 +1,33 @@
+import os
+import sys
+
+from live_whisper_gui.settings import settings
+
+
+def module_command(module: str, *args: str) -> list[str]:
+    """
+    Returns a command running a module with the current interpreter.
+
+    Parameters
+    ----------
+    module: str
+        Full name of a module of this package.
+    args: str
+        Command line arguments of the module.
+    """
+    return [sys.executable, "-m", module, *args]
+
+
+def module_environment() -> dict[str, str]:
+    """
+    Returns environment for a process started with module_command().
+    The package is importable in it even if it's not installed,
+    e.g. when the application is run from its source folder.
+    """
+    return {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, (
+            str(settings.ROOT_DIR.parent),
+            os.getenv("PYTHONPATH"),
+        ))),
+    }
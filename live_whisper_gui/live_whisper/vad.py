@@ -0,0 +1,244 @@
+import warnings
+
+import numpy as np
+
+from live_whisper_gui.settings import settings, user_settings, VadBackend
+
+
+class VoiceActivityDetector:
+    """
+    Base class for voice activity detectors used by the audio callback
+    to decide whether a block contains speech.
+
+    Attributes
+    ----------
+    sample_rate: int
+        Sample rate of incoming blocks.
+    block_size: int
+        Number of samples in one block.
+    """
+    def __init__(self, sample_rate: int, block_size: int):
+        """
+        Parameters
+        ----------
+        sample_rate: int
+            Sample rate of incoming blocks.
+        block_size: int
+            Number of samples in one block.
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+
+    def is_loud(self, samples: np.ndarray) -> bool:
+        """
+        Checks if the peak level of samples exceeds the sensitivity
+        chosen by the user.
+        """
+        return (
+            max(samples.max(), -samples.min())
+            > user_settings.input_device_sensitivity
+        )
+
+    def is_speech(self, block: np.ndarray) -> bool:
+        """
+        Checks if a block contains speech.
+
+        Parameters
+        ----------
+        block: np.ndarray
+            A block of shape (frames, channels) from the input device.
+        """
+        raise NotImplementedError
+
+    def speech_ratio(self, audio: np.ndarray) -> float:
+        """
+        Returns a share of blocks of an audio which contain speech.
+
+        Parameters
+        ----------
+        audio: np.ndarray
+            One-dimensional audio with the detector's sample rate.
+        """
+        num_blocks = len(audio) // self.block_size
+        if not num_blocks:
+            return 0.
+        blocks = audio[:num_blocks * self.block_size].reshape(
+            num_blocks, self.block_size, 1
+        )
+        return sum(map(self.is_speech, blocks)) / num_blocks
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """
+    Cheap detector combining the peak level, the distribution of energy
+    in time, the share of energy within the speech band
+    and zero-crossing rate.
+
+    A block is speech if it's loud enough, its energy isn't concentrated
+    in a few milliseconds like energy of a click is, and either most
+    of its energy is within the speech band (voiced sounds), or its
+    zero-crossing rate is high (fricatives, which have most of their energy
+    above the band).
+    Silent blocks are rejected before any spectrum is computed.
+    """
+    def __init__(self, sample_rate: int, block_size: int):
+        super().__init__(sample_rate, block_size)
+        self._allocate(block_size)
+
+    def _allocate(self, block_size: int):
+        self.block_size = block_size
+        self._squares = np.empty(block_size, dtype=np.float32)
+        # Sums squares of samples within every sub-frame by one product.
+        subframe_size = max(block_size // settings.VAD_SUBFRAMES, 1)
+        subframes = np.arange(block_size) // subframe_size
+        self._subframes = np.equal.outer(
+            np.minimum(subframes, settings.VAD_SUBFRAMES - 1),
+            np.arange(settings.VAD_SUBFRAMES)
+        ).astype(np.float32)
+        self._window = np.hanning(block_size)
+        self._windowed = np.empty(block_size)
+        self._signs = np.empty(block_size, dtype=bool)
+        self._crossings = np.empty(block_size - 1, dtype=bool)
+        frequencies = np.fft.rfftfreq(block_size, 1 / self.sample_rate)
+        # Real and imaginary parts of the spectrum are interleaved.
+        # The columns select the speech band and all but the DC component.
+        self._power = np.empty(2 * len(frequencies))
+        self._bands = np.repeat(
+            np.stack([
+                (frequencies >= settings.VAD_SPEECH_BAND_HZ[0])
+                & (frequencies <= settings.VAD_SPEECH_BAND_HZ[1]),
+                frequencies > 0
+            ], axis=1),
+            2,
+            axis=0
+        ).astype(np.float64)
+
+    def is_loud(self, samples: np.ndarray) -> bool:
+        # Squares are reused by the check of sub-frame energies.
+        np.square(samples, out=self._squares)
+        return (
+            self._squares.max()
+            > user_settings.input_device_sensitivity ** 2
+        )
+
+    def zero_crossing_rate(self, samples: np.ndarray) -> float:
+        """
+        Returns number of zero crossings per second.
+        """
+        np.signbit(samples, out=self._signs)
+        np.not_equal(self._signs[1:], self._signs[:-1], out=self._crossings)
+        return (
+            np.count_nonzero(self._crossings)
+            * self.sample_rate / self.block_size
+        )
+
+    def peak_subframe_energy_share(self, samples: np.ndarray) -> float:
+        """
+        Returns a share of the block's energy within its loudest sub-frame.
+        Clicks have most of their energy in one or two sub-frames,
+        while speech is spread over the whole block.
+        """
+        np.square(samples, out=self._squares)
+        return self._peak_subframe_energy_share()
+
+    def band_energy_ratio(self, samples: np.ndarray) -> float:
+        """
+        Returns a share of the block's energy within the speech band.
+        """
+        np.multiply(samples, self._window, out=self._windowed)
+        spectrum = np.fft.rfft(self._windowed)
+        np.square(spectrum.view(np.float64), out=self._power)
+        in_band, total = np.dot(self._power, self._bands).tolist()
+        if not total:
+            return 0.
+        return in_band / total
+
+    def is_speech(self, block: np.ndarray) -> bool:
+        samples = block[:, 0]
+        if len(samples) != self.block_size:
+            self._allocate(len(samples))
+        if not self.is_loud(samples):
+            return False
+        if (
+            self._peak_subframe_energy_share()
+            > settings.VAD_MAX_SUBFRAME_ENERGY_SHARE
+        ):
+            return False
+        return (
+            self.band_energy_ratio(samples)
+            >= settings.VAD_MIN_BAND_ENERGY_RATIO
+            or self.zero_crossing_rate(samples)
+            >= settings.VAD_FRICATIVE_ZCR_HZ
+        )
+
+    def _peak_subframe_energy_share(self) -> float:
+        energies = np.dot(self._squares, self._subframes).tolist()
+        total = sum(energies)
+        if not total:
+            return 0.
+        return max(energies) / total
+
+
+class WebRTCVAD(VoiceActivityDetector):
+    """
+    Detector using the WebRTC VAD (requires the "webrtcvad" package).
+    Blocks must be 10, 20 or 30 ms long and sampled with 8, 16, 32 or 48 kHz.
+    """
+    supported_sample_rates = 8000, 16000, 32000, 48000
+
+    def __init__(self, sample_rate: int, block_size: int):
+        super().__init__(sample_rate, block_size)
+        try:
+            import webrtcvad
+        except ImportError:
+            raise EnvironmentError(
+                'Please install the "webrtcvad" package '
+                'to use the WebRTC voice activity detector.'
+            )
+        if sample_rate not in self.supported_sample_rates:
+            raise EnvironmentError(
+                f"WebRTC voice activity detector doesn't support "
+                f"{sample_rate} Hz sample rate."
+            )
+        self._vad = webrtcvad.Vad(settings.WEBRTC_VAD_AGGRESSIVENESS)
+        self._scaled = np.empty(block_size, dtype=np.float32)
+        self._pcm = np.empty(block_size, dtype=np.int16)
+
+    def is_speech(self, block: np.ndarray) -> bool:
+        samples = block[:, 0]
+        if not self.is_loud(samples):
+            return False
+        np.multiply(samples, 32767, out=self._scaled)
+        np.copyto(self._pcm, self._scaled, casting='unsafe')
+        return self._vad.is_speech(self._pcm.tobytes(), self.sample_rate)
+
+
+VAD_BACKENDS: dict[str, type[VoiceActivityDetector]] = {
+    "energy": EnergyVAD,
+    "webrtc": WebRTCVAD,
+}
+
+
+def create_vad(
+        backend: VadBackend,
+        sample_rate: int,
+        block_size: int
+) -> VoiceActivityDetector:
+    """
+    Creates a voice activity detector. Falls back to the energy one
+    if the chosen backend can't be used.
+
+    Parameters
+    ----------
+    backend: VadBackend
+        Name of the detector to create.
+    sample_rate: int
+        Sample rate of incoming blocks.
+    block_size: int
+        Number of samples in one block.
+    """
+    try:
+        return VAD_BACKENDS[backend](sample_rate, block_size)
+    except EnvironmentError as error:
+        warnings.warn(f"{error} Falling back to the energy detector.")
+        return EnergyVAD(sample_rate, block_size)
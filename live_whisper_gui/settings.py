@@ -3,15 +3,161 @@ import os
 from typing import Literal, Type, Sequence
 from pathlib import Path
 
-from whisper import _MODELS
-from pydantic import BaseModel, computed_field
+from pydantic import BaseModel, ConfigDict, computed_field, field_validator
 
 
-whisper_models = tuple(_MODELS.keys())
+# Names of models in whisper._MODELS. Listed here to not import whisper
+# (and torch) before the first window is shown.
+whisper_models = (
+    "tiny.en",
+    "tiny",
+    "base.en",
+    "base",
+    "small.en",
+    "small",
+    "medium.en",
+    "medium",
+    "large-v1",
+    "large-v2",
+    "large-v3",
+    "large",
+    "large-v3-turbo",
+    "turbo",
+)
 WhisperModel: Type = Literal[whisper_models]
+Resampler: Type = Literal["scipy", "ffmpeg"]
+SegmentQueuePolicy: Type = Literal["drop_oldest", "merge", "backpressure"]
+VadBackend: Type = Literal["energy", "webrtc"]
+# Names of backends in live_whisper.local_backends.INFERENCE_BACKENDS.
+inference_backends = ("whisper", "faster-whisper")
+InferenceBackendName: Type = Literal[inference_backends]
+# Languages in whisper.tokenizer.LANGUAGES, by their codes.
+languages = {
+    "en": "english",
+    "zh": "chinese",
+    "de": "german",
+    "es": "spanish",
+    "ru": "russian",
+    "ko": "korean",
+    "fr": "french",
+    "ja": "japanese",
+    "pt": "portuguese",
+    "tr": "turkish",
+    "pl": "polish",
+    "ca": "catalan",
+    "nl": "dutch",
+    "ar": "arabic",
+    "sv": "swedish",
+    "it": "italian",
+    "id": "indonesian",
+    "hi": "hindi",
+    "fi": "finnish",
+    "vi": "vietnamese",
+    "he": "hebrew",
+    "uk": "ukrainian",
+    "el": "greek",
+    "ms": "malay",
+    "cs": "czech",
+    "ro": "romanian",
+    "da": "danish",
+    "hu": "hungarian",
+    "ta": "tamil",
+    "no": "norwegian",
+    "th": "thai",
+    "ur": "urdu",
+    "hr": "croatian",
+    "bg": "bulgarian",
+    "lt": "lithuanian",
+    "la": "latin",
+    "mi": "maori",
+    "ml": "malayalam",
+    "cy": "welsh",
+    "sk": "slovak",
+    "te": "telugu",
+    "fa": "persian",
+    "lv": "latvian",
+    "bn": "bengali",
+    "sr": "serbian",
+    "az": "azerbaijani",
+    "sl": "slovenian",
+    "kn": "kannada",
+    "et": "estonian",
+    "mk": "macedonian",
+    "br": "breton",
+    "eu": "basque",
+    "is": "icelandic",
+    "hy": "armenian",
+    "ne": "nepali",
+    "mn": "mongolian",
+    "bs": "bosnian",
+    "kk": "kazakh",
+    "sq": "albanian",
+    "sw": "swahili",
+    "gl": "galician",
+    "mr": "marathi",
+    "pa": "punjabi",
+    "si": "sinhala",
+    "km": "khmer",
+    "sn": "shona",
+    "yo": "yoruba",
+    "so": "somali",
+    "af": "afrikaans",
+    "oc": "occitan",
+    "ka": "georgian",
+    "be": "belarusian",
+    "tg": "tajik",
+    "sd": "sindhi",
+    "gu": "gujarati",
+    "am": "amharic",
+    "yi": "yiddish",
+    "lo": "lao",
+    "uz": "uzbek",
+    "fo": "faroese",
+    "ht": "haitian creole",
+    "ps": "pashto",
+    "tk": "turkmen",
+    "nn": "nynorsk",
+    "mt": "maltese",
+    "sa": "sanskrit",
+    "lb": "luxembourgish",
+    "my": "myanmar",
+    "bo": "tibetan",
+    "tl": "tagalog",
+    "mg": "malagasy",
+    "as": "assamese",
+    "tt": "tatar",
+    "haw": "hawaiian",
+    "ln": "lingala",
+    "ha": "hausa",
+    "ba": "bashkir",
+    "jw": "javanese",
+    "su": "sundanese",
+    "yue": "cantonese",
+}
+# Other names of languages in whisper.tokenizer.TO_LANGUAGE_CODE.
+language_aliases = {
+    "burmese": "my",
+    "valencian": "ca",
+    "flemish": "nl",
+    "haitian": "ht",
+    "letzeburgesch": "lb",
+    "pushto": "ps",
+    "panjabi": "pa",
+    "moldavian": "ro",
+    "moldovan": "ro",
+    "sinhalese": "si",
+    "castilian": "es",
+    "mandarin": "zh",
+    **{name: code for code, name in languages.items()},
+}
+# Names of profiles in live_whisper.decoding.DECODING_PROFILES.
+decoding_profiles = ("lowest_latency", "balanced", "accurate")
+DecodingProfileName: Type = Literal[decoding_profiles]
 
 
 class Settings(BaseModel):
+    model_config = ConfigDict(validate_default=True)
+
     _default_work_dir = Path(os.path.expanduser("~"), ".cache")
     ROOT_DIR: Path = Path(__file__).parent
     WORK_DIR: Path = Path(
@@ -21,14 +167,50 @@ class Settings(BaseModel):
     RESTART_ERROR_CODE: int = 999
     USER_SETTINGS_PATH: Path = WORK_DIR / "settings.json"
     DEFAULT_WHISPER_MODEL: str = "small.en"
-    SAMPLE_RATE: int = 44100
+    SAMPLE_RATE: int = 16000
     BLOCK_SIZE_MSEC: int = 30
     SILENT_BLOCKS_TO_SAVE: int = 11
-    VOCAL_RANGE: tuple = 50, 5000
+    VAD_SPEECH_BAND_HZ: tuple = 100, 4000
+    VAD_MIN_BAND_ENERGY_RATIO: float = 0.6
+    VAD_FRICATIVE_ZCR_HZ: int = 2500
+    VAD_SUBFRAMES: int = 4
+    VAD_MAX_SUBFRAME_ENERGY_SHARE: float = 0.5
+    WEBRTC_VAD_AGGRESSIVENESS: int = 2
     MIN_INPUT_DEVICE_SENSITIVITY: float = 0.00001
     MAX_INPUT_DEVICE_SENSITIVITY: float = 0.1
-    MIN_TRANSCRIBE_BUFFER_LENGTH: int = 50000
-    MAX_TRANSCRIBE_BUFFER_LENGTH: int = 400000
+    MIN_TRANSCRIBE_BUFFER_SEC: float = 1.0
+    MAX_TRANSCRIBE_BUFFER_SEC: float = 9.0
+    SEGMENT_QUEUE_SIZE: int = 4
+    MAX_MERGED_SEGMENT_SEC: float = 30.0
+    TRANSCRIBE_BATCH_SIZE: int = 4
+    TRANSCRIBE_BATCH_WAIT_MSEC: int = 0
+    STREAMING_STEP_MSEC: int = 500
+    STREAMING_MIN_AUDIO_SEC: float = 0.5
+    STREAMING_AGREEMENT: int = 2
+    PROMPT_CONTEXT_WORDS: int = 48
+    AUDIO_CONTEXT_PADDING_SEC: float = 1.0
+    LANGUAGE_LOCK_CONFIRMATIONS: int = 2
+    LANGUAGE_LOCK_MIN_PROBABILITY: float = 0.8
+    LANGUAGE_UNLOCK_MIN_AVG_LOGPROB: float = -1.0
+    LANGUAGE_UNLOCK_SEGMENTS: int = 2
+    TORCH_NUM_THREADS: int | None = os.getenv("LIVE_WHISPER_NUM_THREADS")
+    TORCH_INTEROP_THREADS: int | None = os.getenv(
+        "LIVE_WHISPER_INTEROP_THREADS"
+    )
+    WORKER_CPU_AFFINITY: str | None = os.getenv("LIVE_WHISPER_CPU_AFFINITY")
+    VERIFY_MODEL: bool = os.getenv("LIVE_WHISPER_VERIFY_MODEL", False)
+    DOWNLOAD_CONNECTIONS: int = os.getenv(
+        "LIVE_WHISPER_DOWNLOAD_CONNECTIONS", 1
+    )
+    DOWNLOAD_RETRIES: int = 5
+    DOWNLOAD_TIMEOUT_SEC: float = 30
+    PROGRESS_INTERVAL_SEC: float = 0.25
+    MODEL_DAEMON: bool = os.getenv("LIVE_WHISPER_MODEL_DAEMON", False)
+    MODEL_DAEMON_SOCKET: Path = WORK_DIR / "daemon.sock"
+    MODEL_DAEMON_IDLE_TIMEOUT_SEC: float = 600
+    MODEL_DAEMON_START_TIMEOUT_SEC: float = 30
+    DEVICE_POLL_INTERVAL_SEC: float = 3
+    DEVICE_ENUMERATION_TIMEOUT_SEC: float = 10
 
     @computed_field
     @property
@@ -43,12 +225,46 @@ class Settings(BaseModel):
 
 class UserSettings(BaseModel):
     whisper_model: WhisperModel | None = None
+    inference_backend: InferenceBackendName = "whisper"
+    quantize_model: bool = False
+    model_daemon_enabled: bool = False
+    torch_num_threads: int | None = None
+    torch_interop_threads: int | None = None
+    worker_cpu_affinity: str | None = None
     default_input_device: str | None = None
     input_device_sensitivity: float = 0.01
     show_input_selector_on_startup: bool = True
     print_dots_while_listening: bool = True
     translation_enabled: bool = False
+    language: str | None = None
+    streaming_enabled: bool = False
+    audio_context_bucket_sec: float | None = None
+    decoding_profile: DecodingProfileName = "balanced"
+    no_speech_gate_threshold: float | None = 0.8
+    min_segment_speech_ratio: float = 0.
+    loop_cutting_enabled: bool = True
     window_size: tuple = 320, 450
+    resampler: Resampler = "scipy"
+    segment_queue_policy: SegmentQueuePolicy = "merge"
+    vad_backend: VadBackend = "energy"
+    prompt_context_enabled: bool = True
+    glossary: list[str] = []
+
+    @field_validator("language")
+    @classmethod
+    def validate_language(cls, language: str | None) -> str | None:
+        """
+        Accepts a code or a name of a language Whisper knows,
+        and returns its code.
+        """
+        if language is None:
+            return None
+        language = language.strip().lower()
+        if not language or language in languages:
+            return language or None
+        if language not in language_aliases:
+            raise ValueError(f"Unknown language: {language!r}")
+        return language_aliases[language]
 
     @classmethod
     def load(cls, user_settings_path: Path):